@@ -1,4 +1,14 @@
 from .core.transformer import JsonTransformer, CommandTransformer
-from jsonpath2path.common.constants import AssignType, PickType
+from .core.compiler import compile, compile_script, CompiledCommand, CompiledScript
+from .core.batch import run_batch, BatchResult
+from .core.parallel import run_parallel, ParallelExecutor
+from .core.streaming import stream_jsonl, stream_json_array, StreamResult
+from .core.files import transform_file, transform_stream
+from jsonpath2path.common.metrics import Metrics, CommandMetrics
+from jsonpath2path.common.constants import AssignType, PickType, CopyStrategy, ErrorPolicy, FileFormat, \
+    MissingPolicy
 
-__all__ = ['JsonTransformer', 'CommandTransformer', 'AssignType', 'PickType']
\ No newline at end of file
+__all__ = ['JsonTransformer', 'CommandTransformer', 'compile', 'compile_script', 'CompiledCommand', 'CompiledScript',
+           'run_batch', 'BatchResult', 'run_parallel', 'ParallelExecutor', 'stream_jsonl', 'stream_json_array',
+           'StreamResult', 'transform_file', 'transform_stream', 'Metrics', 'CommandMetrics', 'AssignType', 'PickType',
+           'CopyStrategy', 'ErrorPolicy', 'FileFormat', 'MissingPolicy']
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Benchmark of the datetime converters.
+
+Compares the `datetime.strptime()`/`strftime()` loop of `t_datetime_to_timestamp` and `t_timestamp_to_datetime`
+(as before) with their conversion by `convert.datetimes`, over log-shaped columns where every value repeats
+`repeats` times, and over columns of distinct values. Caches are cleared before each timed run.
+
+Usage: python -m jsonpath2path.benchmarks.datetimes [size] [repeat] [repeats]
+"""
+import sys
+import timeit
+from datetime import datetime
+
+from jsonpath2path.common.cache import datetime_cache
+from jsonpath2path.convert.convert_type import _datetime_to_timestamp_field, _timestamp_to_datetime_field
+
+FORMATS = {
+    "iso": "%Y-%m-%d %H:%M:%S",
+    "iso_micro": "%Y-%m-%dT%H:%M:%S.%f",
+    "fixed": "%d/%m/%Y %H:%M",
+    "locale": "%b %d %Y %H:%M:%S",
+}
+
+
+def timestamps(size: int, repeats: int) -> list[int]:
+    """A column of `size` timestamps a second apart, each repeated `repeats` times in a row."""
+    return [1704110400 + i // repeats for i in range(size)]
+
+
+def strptime_loop(column: list, fmt: str) -> list:
+    return [datetime.strptime(value, fmt).timestamp() for value in column]
+
+
+def strftime_loop(column: list, fmt: str) -> list:
+    return [datetime.fromtimestamp(value).strftime(fmt) for value in column]
+
+
+def run_field(field, column: list, fmt: str) -> list:
+    datetime_cache.clear()
+    convert_value = field(fmt)
+    return [convert_value(value) for value in column]
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    print(f"{'case':24s} {'before':>12s} {'after':>12s} {'speedup':>8s}")
+    for name, fmt in FORMATS.items():
+        for shape, numbers in (("log", timestamps(size, repeats)), ("distinct", timestamps(size, 1))):
+            strings = strftime_loop(numbers, fmt)
+            cases = (
+                ("parse", strptime_loop, _datetime_to_timestamp_field, strings),
+                ("format", strftime_loop, _timestamp_to_datetime_field, numbers),
+            )
+            for kind, before, field, column in cases:
+                assert before(column, fmt) == run_field(field, column, fmt)
+                t_before = timeit.timeit(lambda: before(column, fmt), number=repeat) / repeat
+                t_after = timeit.timeit(lambda: run_field(field, column, fmt), number=repeat) / repeat
+                print(f"{f'{kind} {name} {shape}':24s} {t_before * 1e3:9.1f} ms {t_after * 1e3:9.1f} ms "
+                      f"{t_before / t_after:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark of incremental re-application.
+
+Applies a script to an order of `size` items, then to versions of it with one change each, by `apply()` on the new
+order (as before) and by `apply_incremental()` from the previous output. Copies of the inputs are made outside
+the timed runs.
+
+Usage: python -m jsonpath2path.benchmarks.incremental [size] [repeat]
+"""
+import sys
+import time
+from copy import deepcopy
+
+from jsonpath2path.core.compiler import compile_script
+
+SCRIPT = """
+@$.customer.name -> $.summary.customer
+@$.customer.address.city -> $.summary.city
+@$.items[*].price | v_map "lambda v: round(v * 1.2, 2)" -> $.items[*].gross
+@$.status => $.summary
+"""
+
+
+def order(size: int) -> dict:
+    return {
+        "customer": {"name": "Ada", "address": {"city": "London", "street": "1 Main St"}},
+        "status": "open",
+        "items": [{"sku": f"sku-{i}", "price": i % 100 + 0.5} for i in range(size)],
+        "summary": {},
+    }
+
+
+def changed(data: dict, change: str) -> tuple[dict, list]:
+    data = deepcopy(data)
+    if change == "customer name":
+        data["customer"]["name"] = "Grace"
+        return data, [{"op": "replace", "path": "/customer/name", "value": "Grace"}]
+    if change == "status":
+        data["status"] = "paid"
+        return data, ["$.status"]
+    if change == "item price":
+        data["items"][123]["price"] = 99.5
+        return data, ["/items/123/price"]
+    data["customer"]["address"]["street"] = "2 Main St"
+    return data, ["$.customer.address.street"]
+
+
+def best(run, inputs: list) -> float:
+    times = []
+    for args in inputs:
+        started = time.perf_counter()
+        run(*args)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    script = compile_script(SCRIPT)
+    previous = order(size)
+    previous_output = script.apply(deepcopy(previous))
+
+    print(f"{'change':18s} {'apply':>12s} {'incremental':>12s} {'speedup':>8s}")
+    for change in ("customer name", "status", "unread field", "item price"):
+        data, changes = changed(previous, change)
+        assert script.apply_incremental(data, changes, previous, deepcopy(previous_output)) \
+            == script.apply(deepcopy(data))
+        t_full = best(script.apply, [(deepcopy(data),) for _ in range(repeat)])
+        t_incremental = best(script.apply_incremental,
+                             [(data, changes, previous, deepcopy(previous_output)) for _ in range(repeat)])
+        print(f"{change:18s} {t_full * 1e3:9.2f} ms {t_incremental * 1e3:9.2f} ms {t_full / t_incremental:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark of simple-path matching.
+
+Compares `NodePicker._match_jsonpath` with the jsonpath_ng parser (as before) and with the compiled `SimplePath`,
+for paths of child fields, fixed indices, wildcards and filters. Both parsers are built once, only matching is timed.
+
+Usage: python -m jsonpath2path.benchmarks.paths [size] [repeat]
+"""
+import sys
+import timeit
+
+from jsonpath2path.benchmarks.suite import long_character, wide_character, deep_character, deep_path
+from jsonpath2path.common.cache import parse
+from jsonpath2path.common.fastpath import parse_path
+from jsonpath2path.core.picker import NodePicker
+
+PATHS = {
+    "field": ("long", "$.character.attributes.strength"),
+    "index": ("long", "$.character.skills[3].damage"),
+    "all_indices": ("long", "$.character.skills[*].cooldown"),
+    "all_fields": ("wide", "$.character.attributes.*"),
+    "deep": ("deep", deep_path(64) + ".gem"),
+    "filter": ("long", "$.character.skills[?(@.cooldown > 4)]"),
+    "filter_and": ("long", "$.character.skills[?(@.cooldown > 4 & @.name =~ 'Skill')].damage"),
+}
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    data = {"long": long_character(size), "wide": wide_character(size), "deep": deep_character(64)}
+    data["long"]["character"]["attributes"]["strength"] = 80
+
+    print(f"{'path':12s} {'jsonpath_ng':>14s} {'SimplePath':>14s} {'speedup':>8s}")
+    for name, (shape, jsonpath) in PATHS.items():
+        before, after = parse(jsonpath), parse_path(jsonpath)
+        assert [m.value for m in before.find(data[shape])] == [m.value for m in after.find(data[shape])]
+        t_before = timeit.timeit(lambda: NodePicker._match_jsonpath(data[shape], before), number=repeat) / repeat
+        t_after = timeit.timeit(lambda: NodePicker._match_jsonpath(data[shape], after), number=repeat) / repeat
+        print(f"{name:12s} {t_before * 1e6:11.1f} us {t_after * 1e6:11.1f} us {t_before / t_after:7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
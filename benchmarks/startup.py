@@ -0,0 +1,58 @@
+"""
+Startup benchmark of the command parser.
+
+Compares `CommandTransformer` construction before (LALR tables rebuilt per instance)
+and after (process-wide parser), and the cold start of a fresh process with and without a Lark cache file.
+
+Usage: python -m jsonpath2path.benchmarks.startup [repeat]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import timeit
+
+from lark import Lark
+
+from jsonpath2path.core.transformer import bnf, CommandTransformer, PARSER_CACHE_ENV
+
+COLD_START = (
+    "import time; t = time.perf_counter();"
+    "from jsonpath2path.core.transformer import get_command_parser; get_command_parser();"
+    "print(time.perf_counter() - t)"
+)
+
+
+def per_instance(repeat: int) -> float:
+    # Construction cost before the parser was shared: one `Lark(bnf)` per instance.
+    return timeit.timeit(lambda: Lark(bnf, parser="lalr"), number=repeat) / repeat
+
+
+def shared(repeat: int) -> float:
+    CommandTransformer()  # Warm up the process-wide parser.
+    return timeit.timeit(CommandTransformer, number=repeat) / repeat
+
+
+def cold_start(cache: str | None) -> float:
+    env = dict(os.environ)
+    env.pop(PARSER_CACHE_ENV, None)
+    if cache is not None:
+        env[PARSER_CACHE_ENV] = cache
+    out = subprocess.run([sys.executable, "-c", COLD_START], env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    print(f"CommandTransformer() per-instance grammar: {per_instance(repeat) * 1e6:10.1f} us")
+    print(f"CommandTransformer() shared grammar:       {shared(repeat * 100) * 1e6:10.1f} us")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "command_parser.lark")
+        cold_start(cache)  # Write the cache file.
+        print(f"Cold start, grammar build:                 {cold_start(None) * 1e3:10.2f} ms")
+        print(f"Cold start, Lark cache file:               {cold_start(cache) * 1e3:10.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,295 @@
+"""
+Benchmark suite of the transformation stages.
+
+Scales the shapes of `examples/example_data.py` (wide attribute dicts, long skill lists, deep nesting) and times
+each stage separately: command parsing, `NodePicker` create/pluck/copy, every internal converter,
+and `SlotAssigner.to` in 1:1, 1:N, N:1 and N:N mappings. Inputs are rebuilt outside the timed region.
+
+Results are written as JSON, compare two result files to spot regressions between versions.
+
+Usage:
+    python -m jsonpath2path.benchmarks.suite [--scale N] [--repeat N] [--filter TEXT] [-o results.json]
+    python -m jsonpath2path.benchmarks.suite --compare baseline.json results.json [--threshold 1.2]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from copy import deepcopy
+from dataclasses import dataclass
+from importlib import metadata
+from typing import Callable
+
+from jsonpath2path.common.constants import AssignType, PickType
+from jsonpath2path.core.assigner import SlotAssigner
+from jsonpath2path.core.compiler import compile
+from jsonpath2path.core.converter import NodeConverter
+from jsonpath2path.core.picker import NodePicker
+from jsonpath2path.core.transformer import get_command_parser, CommandTransformer
+from jsonpath2path.examples.example_data import game_character
+
+SCHEMA_VERSION = 1
+
+
+@dataclass
+class Case:
+    """A benchmark case, `setup()` builds fresh inputs for one untimed-setup, timed-run iteration."""
+    name: str
+    stage: str
+    setup: Callable[[], tuple]
+    run: Callable[..., any]
+
+
+# ========== Data shapes ==========
+def skill(i: int) -> dict:
+    return {
+        "name": f"  Skill {i}  ",
+        "damage": 50 + i % 50,
+        "cooldown": i % 10,
+        "mana_cost": None if i % 3 == 0 else 1.2345 * i,
+        "tags": ["fire", "area", None, "fire"] if i % 2 else ["ice", "single"],
+        "learned_at": "2024-01-01 12:00:00",
+        "learned_ts": 1704110400 + i,
+        "passive": i % 4 == 0,
+        "level": str(i % 20),
+        "color": "#ff8800",
+        "meta": '{"source": "trainer", "rank": 1}',
+    }
+
+
+def long_character(size: int) -> dict:
+    """game_character with `size` skills."""
+    data = deepcopy(game_character)
+    data["character"]["skills"] = [skill(i) for i in range(size)]
+    return data
+
+
+def wide_character(size: int) -> dict:
+    """game_character with `size` attributes."""
+    data = deepcopy(game_character)
+    data["character"]["attributes"] = {f"attribute_{i}": i for i in range(size)}
+    return data
+
+
+def deep_character(depth: int) -> dict:
+    """game_character with equipment nested `depth` levels."""
+    data = deepcopy(game_character)
+    node = data["character"]["equipment"]
+    for i in range(depth):
+        node["socket"] = {"gem": f"gem_{i}", "level": i}
+        node = node["socket"]
+    return data
+
+
+def deep_path(depth: int) -> str:
+    return "$.character.equipment" + ".socket" * depth
+
+
+# ========== Cases ==========
+def parser_cases(size: int) -> list[Case]:
+    commands = {
+        "create": '`[["agility", 50], ["lucky", 20]]` => $.character.attributes',
+        "pluck": '$.character.skills[?(@.cooldown > 4)] ->',
+        "convert": '@$.character.skills[*].cooldown | v_map "lambda v: v+5" -> $.character.skills[*].cooldown',
+        "deep": f'@{deep_path(16)}.gem | v_string_trim -> {deep_path(16)}.gem',
+    }
+    parser = get_command_parser()
+    cases = []
+    for name, command in commands.items():
+        cases.append(Case(f"parse.lark.{name}", "parse", lambda c=command: (c,), parser.parse))
+        cases.append(Case(f"parse.compile.{name}", "parse", lambda c=command: (c,), compile))
+    data = long_character(size)
+    cases.append(Case("parse.by.convert", "parse", lambda: (deepcopy(data),),
+                      lambda d: CommandTransformer().source(d).by(commands["convert"])))
+    return cases
+
+
+def picker_cases(size: int) -> list[Case]:
+    long, wide, deep = long_character(size), wide_character(size), deep_character(min(size, 256))
+    edges, nodes = [f"key_{i}" for i in range(size)], list(range(size))
+    return [
+        Case("picker.create", "picker", lambda: (NodePicker(),), lambda p: p.create(edges, nodes)),
+        Case("picker.copy.long", "picker", lambda: (NodePicker(),),
+             lambda p: p.copy(long, "$.character.skills[*]")),
+        Case("picker.copy.filter", "picker", lambda: (NodePicker(),),
+             lambda p: p.copy(long, "$.character.skills[?(@.cooldown > 4)]")),
+        Case("picker.copy.wide", "picker", lambda: (NodePicker(),),
+             lambda p: p.copy(wide, "$.character.attributes.*")),
+        Case("picker.copy.deep", "picker", lambda: (NodePicker(),),
+             lambda p: p.copy(deep, deep_path(min(size, 256)))),
+        Case("picker.pluck.long", "picker", lambda: (NodePicker(), deepcopy(long)),
+             lambda p, d: p.pluck(d, "$.character.skills[*]")),
+        Case("picker.pluck.wide", "picker", lambda: (NodePicker(), deepcopy(wide)),
+             lambda p, d: p.pluck(d, "$.character.attributes.*")),
+    ]
+
+
+# Converter name -> arguments, applied to `size` skills, or `size` attributes for key converters.
+CONVERTER_ARGS = {
+    "k_rename": ("pascal",),
+    "k_reformat": ("skill_{key}",),
+    "t_string_to_number": ("$.level",),
+    "t_number_to_string": ("$.damage",),
+    "t_number_to_bool": ("$.cooldown",),
+    "t_bool_to_number": ("$.passive",),
+    "t_datetime_to_timestamp": ("$.learned_at",),
+    "t_timestamp_to_datetime": ("$.learned_ts",),
+    "t_array_to_string": ("$.tags",),
+    "t_string_to_array": ("$.name", " "),
+    "t_json_string_to_object": ("$.meta",),
+    "t_object_to_json_string": ("$.tags",),
+    "t_hex_to_rgb": ("$.color",),
+    "v_filter": ("$.cooldown", 4, ">"),
+    "v_map": ("lambda v: v",),
+    "v_sort": (False, "$.damage"),
+    "v_string_trim": ("$.name",),
+    "v_string_replace": ("$.name", "Skill", "Spell"),
+    "v_string_truncate": ("$.name", 5),
+    "v_number_round": ("$.mana_cost", 1),
+    "v_number_convert_units": ("$.damage", 1.5, 2),
+    "v_null_to_default": ("$.mana_cost", 0),
+    "v_null_drop": ("$.tags",),
+    "v_list_unique": ("$.tags",),
+    "v_list_sort": ("$.tags", False, str),
+    "v_list_filter": ("$.tags", lambda tag: tag is not None),
+}
+
+
+def converter_cases(size: int) -> list[Case]:
+    skills = NodePicker.build_parser("$.character.skills[*]").find(long_character(size))
+    attributes = NodePicker.build_parser("$.character.attributes.*").find(wide_character(size))
+    cases = []
+    for name, args in CONVERTER_ARGS.items():
+        matches = attributes if name.startswith("k_") else skills
+
+        # Plucked matches are not shared with the source, so the cost of converting alone is measured.
+        def setup(name=name, args=args, matches=matches):
+            converter = NodeConverter()
+            converter.source(deepcopy(matches), PickType.PLUCK)
+            return converter, converter.resolve(name), args
+        cases.append(Case(f"converter.{name}", "converter", setup,
+                          lambda converter, func, args: converter.apply(func, *args)))
+    return cases
+
+
+def assigner_cases(size: int) -> list[Case]:
+    long, wide = long_character(size), wide_character(size)
+    edges, nodes = [f"key_{i}" for i in range(size)], list(range(size))
+    # Mapping -> nodes (edges, values), target data and (slot JSONPath, assign type).
+    mappings = {
+        "1:1": ((["weapon"], ["Rune Blade"]), long, ("$.character.equipment.weapon", AssignType.OCCUPY)),
+        "1:N": ((["cooldown"], [0]), long, ("$.character.skills[*].cooldown", AssignType.OCCUPY)),
+        "N:1": ((edges, nodes), wide, ("$.character.attributes", AssignType.MOUNT)),
+        "N:N": (([0] * size, nodes), long, ("$.character.skills[*].cooldown", AssignType.OCCUPY)),
+    }
+    cases = []
+    for mapping, ((edges, nodes), data, (jsonpath, assign_type)) in mappings.items():
+        def setup(edges=edges, nodes=nodes, data=data, jsonpath=jsonpath, assign_type=assign_type):
+            assigner = SlotAssigner().assign(jsonpath, assign_type).source(list(edges), list(nodes))
+            return assigner, deepcopy(data)
+        cases.append(Case(f"assigner.{mapping}", "assigner", setup, lambda assigner, data: assigner.to(data)))
+    return cases
+
+
+def all_cases(size: int) -> list[Case]:
+    return parser_cases(size) + picker_cases(size) + converter_cases(size) + assigner_cases(size)
+
+
+# ========== Runner ==========
+def measure(case: Case, repeat: int, warmup: int = 1) -> dict:
+    times = []
+    for i in range(warmup + repeat):
+        args = case.setup()
+        start = time.perf_counter()
+        case.run(*args)
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            times.append(elapsed)
+    return {
+        "name": case.name,
+        "stage": case.stage,
+        "repeat": repeat,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+    }
+
+
+def version(package: str) -> str:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def run(scale: int, repeat: int, name_filter: str = None) -> dict:
+    results = []
+    for case in all_cases(scale):
+        if name_filter and name_filter not in case.name:
+            continue
+        results.append(measure(case, repeat))
+        print(f"{case.name:40s} {results[-1]['median'] * 1e6:12.1f} us", file=sys.stderr)
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "scale": scale,
+        "environment": {
+            "jsonpath2path": version("jsonpath2path"),
+            "jsonpath_ng": version("jsonpath_ng"),
+            "lark": version("lark"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> int:
+    """Print median ratios current / baseline, return the number of cases slower than threshold."""
+    if baseline["scale"] != current["scale"]:
+        print(f"Warning: scale {baseline['scale']} vs {current['scale']}, ratios are not comparable", file=sys.stderr)
+    before = {result["name"]: result for result in baseline["results"]}
+    regressions = 0
+    for result in current["results"]:
+        if result["name"] not in before:
+            continue
+        ratio = result["median"] / before[result["name"]]["median"]
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{result['name']:40s} {ratio:8.2f}x{flag}")
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="jsonpath2path.benchmarks.suite")
+    parser.add_argument("--scale", type=int, default=1000, help="Number of list items / dict keys.")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per case.")
+    parser.add_argument("--filter", help="Run only cases whose name contains this text.")
+    parser.add_argument("-o", "--output", help="Result file, stdout by default.")
+    parser.add_argument("--compare", nargs=2, metavar=("BASELINE", "CURRENT"), help="Compare two result files.")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression.")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f, open(args.compare[1]) as g:
+            return 1 if compare(json.load(f), json.load(g), args.threshold) else 0
+
+    results = run(args.scale, args.repeat, args.filter)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
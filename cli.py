@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import sys
+
+from jsonpath2path.common import jsonio
+from jsonpath2path.common.constants import ErrorPolicy, FileFormat
+from jsonpath2path.common.metrics import Metrics
+from jsonpath2path.core.files import STDIO_PATH, transform_file
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="jsonpath2path", description="Transform JSON files by jsonpath2path commands.")
+    parser.add_argument("input", nargs="?", default=STDIO_PATH, help="Input file, `-` for stdin (default).")
+    parser.add_argument("-c", "--command", action="append", default=[], help="Command to apply, repeatable.")
+    parser.add_argument("-f", "--script", help="File of commands, one per line, `#` starts a comment line.")
+    parser.add_argument("-o", "--output", default=STDIO_PATH, help="Output file, `-` for stdout (default).")
+    parser.add_argument("--format", choices=[f.name.lower() for f in FileFormat],
+                        help="Input layout, guessed from the input suffix by default.")
+    parser.add_argument("--on-error", choices=[p.name.lower() for p in ErrorPolicy], default="raise",
+                        help="How failed documents are handled, stops at the first by default.")
+    parser.add_argument("--columnar", action="store_true",
+                        help="Run convert functions over whole columns of picked nodes where supported.")
+    parser.add_argument("--json-backend", choices=jsonio.JSON_BACKENDS,
+                        help="JSON library, the fastest one installed by default, all read and write the same data.")
+    parser.add_argument("--metrics-file",
+                        help="Write per-command metrics to this file in the Prometheus text format.")
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    commands = list(args.command)
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            commands.extend(f.read().splitlines())
+    if not commands:
+        print("jsonpath2path: no command given, use -c or -f", file=sys.stderr)
+        return 2
+    if args.json_backend:
+        jsonio.set_json_backend(args.json_backend)
+
+    metrics = Metrics() if args.metrics_file else None
+    result = transform_file(commands, args.input, args.output,
+                            FileFormat[args.format.upper()] if args.format else None,
+                            on_error=ErrorPolicy[args.on_error.upper()], columnar=args.columnar,
+                            metrics_hook=metrics)
+    if metrics is not None:
+        metrics.write_prometheus(args.metrics_file)
+    for failure in result.failures:
+        print(f"jsonpath2path: document {failure.index} failed: {failure.error}", file=sys.stderr)
+    return 1 if result.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable
+
+from jsonpath_ng import JSONPath
+from jsonpath_ng.ext import parse as _parse
+
+DEFAULT_JSONPATH_CACHE_SIZE = 1024
+DEFAULT_LAMBDA_CACHE_SIZE = 256
+DEFAULT_KEY_NAME_CACHE_SIZE = 4096
+DEFAULT_DATETIME_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of cache counters."""
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    maxsize: int
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe LRU cache with hit/miss/eviction counters.
+    """
+
+    def __init__(self, maxsize: int):
+        if maxsize < 0:
+            raise ValueError("Cache size must not be negative")
+        self._maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._evictions = 0
+
+    def get(self, key: Hashable, factory: Callable[[], any]) -> any:
+        """
+        Get the value of key, creating it by `factory()` on miss.
+        Exceptions raised by factory are propagated and nothing is cached.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+                self._data.move_to_end(key)
+                self._hits += 1
+                return value
+            except KeyError:
+                self._misses += 1
+
+        # Build outside the lock, a concurrent miss on the same key only costs a second build.
+        value = factory()
+
+        with self._lock:
+            if self._maxsize > 0:
+                self._data[key] = value
+                self._data.move_to_end(key)
+                self._evict()
+        return value
+
+    def resize(self, maxsize: int) -> None:
+        if maxsize < 0:
+            raise ValueError("Cache size must not be negative")
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions, len(self._data), self._maxsize)
+
+    def _evict(self):
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+# Process-wide cache of parsed JSONPath expressions, shared by picker, assigner and converters.
+jsonpath_cache = LRUCache(DEFAULT_JSONPATH_CACHE_SIZE)
+
+
+def parse(jsonpath: str) -> JSONPath:
+    """
+    Drop-in replacement of `jsonpath_ng.ext.parse`, identical path strings are parsed once per process.
+    """
+    return jsonpath_cache.get(jsonpath, lambda: _parse(jsonpath))
+
+
+def set_jsonpath_cache_size(maxsize: int) -> None:
+    """Set the maximum number of parsed JSONPath expressions kept, `0` disables caching."""
+    jsonpath_cache.resize(maxsize)
+
+
+def jsonpath_cache_stats() -> CacheStats:
+    return jsonpath_cache.stats()
+
+
+# Process-wide cache of functions evaluated from lambda strings of convert arguments, keyed by source text.
+lambda_cache = LRUCache(DEFAULT_LAMBDA_CACHE_SIZE)
+
+
+def set_lambda_cache_size(maxsize: int) -> None:
+    """Set the maximum number of lambda functions kept, `0` disables caching."""
+    lambda_cache.resize(maxsize)
+
+
+def lambda_cache_stats() -> CacheStats:
+    return lambda_cache.stats()
+
+
+# Process-wide cache of key names converted between naming conventions, keyed by (name, source, target).
+key_name_cache = LRUCache(DEFAULT_KEY_NAME_CACHE_SIZE)
+
+
+def set_key_name_cache_size(maxsize: int) -> None:
+    """Set the maximum number of converted key names kept, `0` disables caching."""
+    key_name_cache.resize(maxsize)
+
+
+# Process-wide cache of datetime strings parsed by format, keyed by (string, format).
+datetime_cache = LRUCache(DEFAULT_DATETIME_CACHE_SIZE)
+
+
+def set_datetime_cache_size(maxsize: int) -> None:
+    """Set the maximum number of parsed datetime strings kept, `0` disables caching."""
+    datetime_cache.resize(maxsize)
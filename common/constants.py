@@ -11,4 +11,47 @@ class AssignType(Enum):
 
 VIRTUAL_ROOT_EDGE = "__DATA__"
 
-ROOT_JSON_PATH = "$"
\ No newline at end of file
+ROOT_JSON_PATH = "$"
+
+class CopyStrategy(Enum):
+    """How picked nodes are copied on their way to slots."""
+    # Deep copy every picked node.
+    DEEP = 1
+    # Pass references, copy only containers that converters write to or that land in slots.
+    ON_WRITE = 2
+    # Like ON_WRITE, but copy-picked nodes land in slots by reference, shared with the source.
+    REFERENCE = 3
+
+class Mutation(Enum):
+    """How a convert function changes the picked nodes."""
+    # Only edges, or the order and number of nodes.
+    NONE = 1
+    # Fields inside nodes addressed by its JSONPath argument.
+    FIELDS = 2
+    # Anything inside nodes.
+    NODES = 3
+
+class MissingPolicy(Enum):
+    """Where sorting puts items whose sort key is missing or null."""
+    # Before all other items.
+    FIRST = 1
+    # After all other items.
+    LAST = 2
+
+class ErrorPolicy(Enum):
+    """How a batch handles documents that fail to transform."""
+    # Abort the batch with the first error.
+    RAISE = 1
+    # Record failures and continue.
+    COLLECT = 2
+    # Drop failed documents and continue, only counting them.
+    SKIP = 3
+
+class FileFormat(Enum):
+    """Layout of JSON files and streams."""
+    # One JSON document.
+    JSON = 1
+    # One JSON document per line.
+    JSONL = 2
+    # A top-level array, each element transformed as a document.
+    JSON_ARRAY = 3
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import copy
+import sys
+from dataclasses import dataclass
+from typing import Callable
+
+from jsonpath_ng import DatumInContext, Fields, Index
+
+from jsonpath2path.common.cache import parse
+
+
+@dataclass
+class CopyStats:
+    """
+    Container objects (dict/list) and bytes copied for one command, and those avoided compared with deep copying
+    every picked node. Scalars are immutable and never copied.
+    """
+    objects_copied: int = 0
+    bytes_copied: int = 0
+    objects_avoided: int = 0
+    bytes_avoided: int = 0
+    command: str | None = None
+
+
+def measure(value: any) -> tuple[int, int]:
+    """Count the container objects and their bytes in value, as `copy.deepcopy` would duplicate them."""
+    objects, size, stack, seen = 0, 0, [value], set()
+    while stack:
+        value = stack.pop()
+        if not isinstance(value, (dict, list)) or id(value) in seen:
+            continue
+        seen.add(id(value))
+        objects += 1
+        size += sys.getsizeof(value)
+        stack.extend(value.values() if isinstance(value, dict) else value)
+    return objects, size
+
+
+def _edges_to(datum: DatumInContext) -> list[str | int] | None:
+    """Edges from the root of a match to datum, None if a step is not a plain field or index."""
+    edges = []
+    while datum.context is not None:
+        path = datum.path
+        if isinstance(path, Fields) and len(path.fields) == 1:
+            edges.append(path.fields[0])
+        elif isinstance(path, Index):
+            edges.append(path.index)
+        else:
+            return None
+        datum = datum.context
+    return edges[::-1]
+
+
+class NodeCopier:
+    """
+    Copy-on-write bookkeeping for nodes shared with the source data.
+
+    Shared nodes are passed by reference. Containers are copied only when a converter is about to write to them,
+    and the parts still shared are copied when nodes land in slots.
+    """
+
+    def __init__(self, shared: bool, stats_hook: Callable[[CopyStats], None] | None = None):
+        self._shared = shared
+        # id -> container, for containers copied here. Holding them keeps their ids unique.
+        # Shallow copies may still hold shared children, deep copies are private throughout.
+        self._shallow: dict[int, dict | list] = {}
+        self._deep: dict[int, dict | list] = {}
+        self._stats_hook = stats_hook
+        self.stats = CopyStats()
+
+    def baseline(self, nodes: list) -> None:
+        """Record picked nodes as deep copying would have duplicated them."""
+        if self._stats_hook is not None:
+            for node in nodes:
+                objects, size = measure(node)
+                self.stats.objects_avoided += objects
+                self.stats.bytes_avoided += size
+
+    def copied(self, nodes: list) -> None:
+        """Record picked nodes deep copied up front."""
+        if self._stats_hook is not None:
+            for node in nodes:
+                objects, size = measure(node)
+                self.stats.objects_copied += objects
+                self.stats.bytes_copied += size
+
+    def prepare_fields(self, nodes: list, jsonpaths: list) -> None:
+        """Copy the containers on the way to the fields addressed by jsonpaths, before a converter writes them."""
+        if not self._shared:
+            return
+        parsers = [parse(jsonpath) for jsonpath in jsonpaths if isinstance(jsonpath, str)]
+        for i, node in enumerate(nodes):
+            for parser in parsers:
+                if not isinstance(node, (dict, list)) or id(node) in self._deep:
+                    break
+                for match in parser.find(node):
+                    if match.context is None:
+                        continue
+                    edges = _edges_to(match.context)
+                    if edges is None:
+                        node = self._deep_copy(node)
+                        break
+                    node = self._own_path(node, edges)
+            nodes[i] = node
+
+    def prepare_nodes(self, nodes: list) -> None:
+        """Copy whatever is still shared, before a converter that may change anything inside the nodes."""
+        if self._shared:
+            nodes[:] = [self._materialize(node) for node in nodes]
+
+    def release(self, nodes: list, keep_shared: bool = False) -> None:
+        """Nodes leave for slots, copy what is still shared unless keep_shared."""
+        if not keep_shared:
+            self.prepare_nodes(nodes)
+        if self._stats_hook is not None:
+            self._stats_hook(self.stats)
+
+    def _own_path(self, node: dict | list, edges: list[str | int]) -> dict | list:
+        node = parent = self._shallow_copy(node)
+        for edge in edges:
+            child = parent[edge]
+            if not isinstance(child, (dict, list)):
+                break
+            parent[edge] = parent = self._shallow_copy(child)
+        return node
+
+    def _materialize(self, value: any) -> any:
+        if not isinstance(value, (dict, list)) or id(value) in self._deep:
+            return value
+        if id(value) not in self._shallow:
+            return self._deep_copy(value)
+        for edge, child in (value.items() if isinstance(value, dict) else enumerate(value)):
+            if isinstance(child, (dict, list)):
+                value[edge] = self._materialize(child)
+        return value
+
+    def _shallow_copy(self, value: dict | list) -> dict | list:
+        if id(value) in self._shallow:
+            return value
+        value = copy.copy(value)
+        self._shallow[id(value)] = value
+        self._count(1, sys.getsizeof(value))
+        return value
+
+    def _deep_copy(self, value: dict | list) -> dict | list:
+        if self._stats_hook is not None:
+            self._count(*measure(value))
+        value = copy.deepcopy(value)
+        self._deep[id(value)] = value
+        return value
+
+    def _count(self, objects: int, size: int):
+        if self._stats_hook is not None:
+            self.stats.objects_copied += objects
+            self.stats.bytes_copied += size
+            self.stats.objects_avoided -= objects
+            self.stats.bytes_avoided -= size
@@ -25,7 +25,9 @@ class JsonPathMatchIndex:
 
     def get_context_edge(self, idx: int):
         if idx < len(self._match_index):
-            return get_edge(self._match_index[idx].context)
+            context = self._match_index[idx].context
+            # Created nodes have no context.
+            return get_edge(context) if context is not None else None
 
 
 @dataclass
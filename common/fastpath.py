@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from jsonpath_ng import JSONPath, Child, Fields, Index, Root, Slice, This
+from jsonpath_ng.ext.filter import Filter, Expression, OPERATOR_MAP
+
+from jsonpath2path.common.cache import jsonpath_cache, parse
+from jsonpath2path.common.utils import PathMatch
+
+# Steps of a simple path.
+FIELD, ALL_FIELDS, INDEX, ALL_INDICES, FILTER = range(5)
+
+
+def _chain(path: JSONPath) -> list[JSONPath]:
+    """Flatten `Child(Child(a, b), c)` into `[a, b, c]`."""
+    if isinstance(path, Child):
+        return _chain(path.left) + _chain(path.right)
+    return [path]
+
+
+def _step(path: JSONPath) -> tuple[int, any] | None:
+    if isinstance(path, Fields) and len(path.fields) == 1:
+        return (ALL_FIELDS, None) if path.fields[0] == "*" else (FIELD, path.fields[0])
+    if isinstance(path, Index):
+        return INDEX, path.index
+    if isinstance(path, Slice) and path.start is None and path.end is None and path.step is None:
+        return ALL_INDICES, None
+    if isinstance(path, Filter) and path.expressions:
+        predicates = [_compile_expression(expression) for expression in path.expressions]
+        if None not in predicates:
+            return FILTER, predicates
+    return None
+
+
+def _compile_expression(expression: Expression) -> Callable[[any], bool] | None:
+    """
+    Compile a filter expression into a predicate on an element, same as `Expression.find(element)` being non-empty.
+    Only targets of child fields below `@` are compiled.
+    """
+    chain = _chain(expression.target)
+    if isinstance(chain[0], (This, Root)):
+        # `$` inside a filter is the element itself, as jsonpath_ng matches it on the bare element.
+        chain = chain[1:]
+    fields = []
+    for path in chain:
+        if not isinstance(path, Fields) or len(path.fields) != 1 or path.fields[0] == "*":
+            return None
+        fields.append(path.fields[0])
+
+    op, expected = expression.op, expression.value
+    compare = OPERATOR_MAP.get(op)
+    if op is not None and compare is None:
+        return None
+
+    def predicate(element: any) -> bool:
+        value = element
+        for field in fields:
+            if not isinstance(value, dict) or field not in value:
+                return False
+            value = value[field]
+        if op is None:
+            return True
+        # Integers (and booleans) compare with the value converted by `int()`, as jsonpath_ng does.
+        if isinstance(expected, int):
+            try:
+                value = int(value)
+            except ValueError:
+                return False
+        return bool(compare(value, expected))
+
+    return predicate
+
+
+class SimplePath(JSONPath):
+    """
+    JSONPath made only of child fields, fixed indices, `.*` / `[*]` wildcards and `[?(...)]` filters
+    comparing child fields of `@`, e.g. `$.items[3].price` or `$.skills[?(@.cooldown > 4)]`.
+
+    Compiled from the jsonpath_ng syntax tree into a tuple of steps walked with plain dict/list indexing,
+    filters become Python predicates, and matches are `PathMatch`.
+    Where jsonpath_ng gives non-list values special treatment (an index, `[*]` or a filter on a dict or string),
+    `find()` falls back to jsonpath_ng, so results are the same.
+    """
+
+    def __init__(self, jsonpath: str, steps: tuple[tuple[int, any], ...], parser: JSONPath):
+        self.jsonpath = jsonpath
+        self.steps = steps
+        # Hashable form of steps, equal for equal steps of different paths.
+        self.keys = tuple((kind, repr(path)) if kind == FILTER else (kind, arg)
+                          for (kind, arg), path in zip(steps, _chain(parser)[1:]))
+        self._parser = parser
+
+    @classmethod
+    def compile(cls, jsonpath: str) -> SimplePath | None:
+        """Compile jsonpath, None if it is not a simple path."""
+        parser = parse(jsonpath)
+        chain = _chain(parser)
+        if not isinstance(chain[0], Root):
+            return None
+        steps = [_step(path) for path in chain[1:]]
+        if None in steps:
+            return None
+        return cls(jsonpath, tuple(steps), parser)
+
+    def find(self, data: any) -> list:
+        matches = self.walk([PathMatch(data)], 0, len(self.steps))
+        return self._parser.find(data) if matches is None else matches
+
+    def walk(self, matches: list[PathMatch], start: int, stop: int) -> list[PathMatch] | None:
+        """
+        Walk `steps[start:stop]` from matches of the first start steps.
+        :return: Matches, or None where jsonpath_ng has to evaluate the whole path instead.
+        """
+        for kind, arg in self.steps[start:stop]:
+            found = []
+            for match in matches:
+                value = match.value
+                if kind == FIELD:
+                    if isinstance(value, dict) and arg in value:
+                        found.append(PathMatch(value[arg], arg, match))
+                elif kind == ALL_FIELDS:
+                    if isinstance(value, dict):
+                        found.extend(PathMatch(child, edge, match) for edge, child in value.items())
+                elif type(value) is list:
+                    if kind == INDEX:
+                        if value and len(value) > arg:
+                            found.append(PathMatch(value[arg], arg, match))
+                    elif kind == ALL_INDICES:
+                        found.extend(PathMatch(child, edge, match) for edge, child in enumerate(value))
+                    else:
+                        # Every predicate is evaluated, so errors are raised as by jsonpath_ng.
+                        found.extend(PathMatch(child, edge, match) for edge, child in enumerate(value)
+                                     if all([predicate(child) for predicate in arg]))
+                elif kind == FILTER:
+                    if isinstance(value, dict):
+                        return None
+                elif value:
+                    return None
+            matches = found
+        return matches
+
+    def __str__(self):
+        return self.jsonpath
+
+    def __repr__(self):
+        return f"SimplePath({self.jsonpath!r})"
+
+
+def parse_path(jsonpath: str) -> JSONPath:
+    """
+    Like `parse()`, but simple paths are compiled into a `SimplePath`.
+    Matches may be `PathMatch` rather than `DatumInContext`, with value, context and edge only.
+    """
+    return jsonpath_cache.get((SimplePath, jsonpath), lambda: SimplePath.compile(jsonpath) or parse(jsonpath))
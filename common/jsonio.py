@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import importlib
+import json
+import math
+import os
+import re
+
+# Name of the JSON backend to use, see `set_json_backend()`.
+JSON_BACKEND_ENV = "JSONPATH2PATH_JSON_BACKEND"
+
+# Fastest first, the standard library is always available.
+JSON_BACKENDS = ("orjson", "ujson", "json")
+
+_backend_name: str = "json"
+_loads = json.loads
+_dumps_bytes = None
+
+
+def _json_dumps(data: any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_dumps_bytes(data: any) -> bytes:
+    return _json_dumps(data).encode("utf-8")
+
+
+def _has_non_finite(data: any) -> bool:
+    """Whether data holds NaN or an infinity, which orjson writes as null."""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+# Integers of 19 digits and more may not fit 64 bits, e.g. those below -2**63, orjson reads them as floats.
+_LONG_DIGITS = re.compile(r"\d{19}")
+_LONG_DIGITS_BYTES = re.compile(rb"\d{19}")
+
+
+def _orjson_loads(module) -> callable:
+    def loads(data: str | bytes) -> any:
+        if (_LONG_DIGITS_BYTES if isinstance(data, bytes) else _LONG_DIGITS).search(data):
+            raise ValueError("Integer may exceed 64 bits")
+        return module.loads(data)
+
+    return loads
+
+
+def _orjson_dumps(module) -> callable:
+    # Types the json module rejects, e.g. datetime, raise instead of being serialized.
+    option = (module.OPT_NON_STR_KEYS | module.OPT_PASSTHROUGH_DATETIME | module.OPT_PASSTHROUGH_DATACLASS
+              | module.OPT_PASSTHROUGH_SUBCLASS)
+
+    def dumps(data: any) -> bytes:
+        result = module.dumps(data, option=option)
+        # Only null may stand for a non-finite float.
+        if b"null" in result and _has_non_finite(data):
+            raise ValueError("Non-finite float")
+        return result
+
+    return dumps
+
+
+def set_json_backend(name: str | None = None) -> str:
+    """
+    Select the JSON backend used for reading and writing documents.
+
+    Values the faster backends cannot represent the way the json module does, e.g. integers beyond 64 bits,
+    NaN and infinities, fall back to the standard library, and types the json module rejects, e.g. datetime,
+    raise TypeError on every backend. Only types the faster backends serialize and the json module does not,
+    e.g. UUID and Enum values with orjson, differ.
+
+    :param name: `orjson` | `ujson` | `json`, or None for the fastest one installed.
+    :return: Name of the selected backend.
+    """
+    global _backend_name, _loads, _dumps_bytes
+    if name is None:
+        for candidate in JSON_BACKENDS:
+            try:
+                importlib.import_module(candidate)
+            except ImportError:
+                continue
+            name = candidate
+            break
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name}, expected one of {', '.join(JSON_BACKENDS)}")
+    module = importlib.import_module(name)
+
+    if name == "orjson":
+        _loads = _orjson_loads(module)
+        _dumps_bytes = _orjson_dumps(module)
+    elif name == "ujson":
+        _loads = module.loads
+        _dumps_bytes = lambda data: module.dumps(data, ensure_ascii=False, escape_forward_slashes=False,
+                                                  allow_nan=False).encode("utf-8")
+    else:
+        _loads = json.loads
+        _dumps_bytes = _json_dumps_bytes
+    _backend_name = name
+    return name
+
+
+def get_json_backend() -> str:
+    return _backend_name
+
+
+def loads(data: str | bytes) -> any:
+    """Decode JSON text or UTF-8 bytes."""
+    try:
+        return _loads(data)
+    except (ValueError, OverflowError):
+        if _loads is json.loads:
+            raise
+    return json.loads(data)
+
+
+def dumps_bytes(data: any) -> bytes:
+    """Encode data as compact UTF-8 JSON."""
+    try:
+        return _dumps_bytes(data)
+    except (TypeError, ValueError, OverflowError):
+        if _dumps_bytes is _json_dumps_bytes:
+            raise
+    return _json_dumps_bytes(data)
+
+
+def dumps(data: any) -> str:
+    """Encode data as compact JSON text."""
+    if _dumps_bytes is _json_dumps_bytes:
+        return _json_dumps(data)
+    return dumps_bytes(data).decode("utf-8")
+
+
+set_json_backend(os.environ.get(JSON_BACKEND_ENV) or None)
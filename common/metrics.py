@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from jsonpath2path.common.cache import CacheStats, jsonpath_cache, lambda_cache, key_name_cache, datetime_cache
+
+logger = logging.getLogger("jsonpath2path")
+
+
+@dataclass
+class CommandMetrics:
+    """
+    Measurements of one command, from picking to assigning, passed to the metrics hook.
+    Times are wall-clock seconds.
+    """
+    command: str | None = None
+    pick_seconds: float = 0.0
+    convert_seconds: float = 0.0
+    assign_seconds: float = 0.0
+    # Nodes picked, and nodes placed in slots.
+    matches: int = 0
+    slots: int = 0
+    # (name, seconds) of each converter, fused converters are named `a+b`.
+    converters: list[tuple[str, float]] = field(default_factory=list)
+    # Containers copied on the way to slots, see `CopyStats`.
+    objects_copied: int = 0
+    bytes_copied: int = 0
+    # Type name of the exception the command raised.
+    error: str | None = None
+
+    @property
+    def total_seconds(self) -> float:
+        return self.pick_seconds + self.convert_seconds + self.assign_seconds
+
+    def converted(self, name: str, started: float) -> None:
+        """Record a converter run since `started`, a `time.perf_counter()` value."""
+        seconds = time.perf_counter() - started
+        self.converters.append((name, seconds))
+        self.convert_seconds += seconds
+
+
+def cache_stats() -> dict[str, CacheStats]:
+    """Counters of the process-wide caches by name."""
+    return {
+        "jsonpath": jsonpath_cache.stats(),
+        "lambda": lambda_cache.stats(),
+        "key_name": key_name_cache.stats(),
+        "datetime": datetime_cache.stats(),
+    }
+
+
+@dataclass
+class _Totals:
+    runs: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    matches: int = 0
+    slots: int = 0
+    objects_copied: int = 0
+    bytes_copied: int = 0
+    # Seconds by stage.
+    stages: dict[str, float] = field(default_factory=lambda: {"pick": 0.0, "convert": 0.0, "assign": 0.0})
+
+
+class Metrics:
+    """
+    Metrics hook aggregating `CommandMetrics` per command and per converter, thread-safe.
+    Pass it as `metrics_hook` to `compile()` or `JsonTransformer.metrics()`, then export by `log()`
+    or `write_prometheus()`, which add the hit rates of the process-wide caches.
+
+    Usage:
+        metrics = Metrics()
+        compile(command, metrics_hook=metrics).apply(data)
+        metrics.write_prometheus("/var/lib/node_exporter/jsonpath2path.prom")
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._commands: dict[str, _Totals] = {}
+        # Runs and seconds by converter name.
+        self._converters: dict[str, list] = {}
+
+    def __call__(self, metrics: CommandMetrics) -> None:
+        with self._lock:
+            totals = self._commands.setdefault(metrics.command or "", _Totals())
+            totals.runs += 1
+            totals.errors += metrics.error is not None
+            totals.seconds += metrics.total_seconds
+            totals.matches += metrics.matches
+            totals.slots += metrics.slots
+            totals.objects_copied += metrics.objects_copied
+            totals.bytes_copied += metrics.bytes_copied
+            totals.stages["pick"] += metrics.pick_seconds
+            totals.stages["convert"] += metrics.convert_seconds
+            totals.stages["assign"] += metrics.assign_seconds
+            for name, seconds in metrics.converters:
+                counts = self._converters.setdefault(name, [0, 0.0])
+                counts[0] += 1
+                counts[1] += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self._commands.clear()
+            self._converters.clear()
+
+    def log(self, target: logging.Logger = None, level: int = logging.INFO) -> None:
+        """Log a line per command, converter and cache, to the `jsonpath2path` logger by default."""
+        target = target or logger
+        with self._lock:
+            commands = list(self._commands.items())
+            converters = list(self._converters.items())
+        for command, totals in commands:
+            stages = " ".join(f"{stage}={seconds:.6f}s" for stage, seconds in totals.stages.items())
+            target.log(level, "command %r: runs=%d errors=%d %s matches=%d slots=%d objects_copied=%d bytes_copied=%d",
+                       command, totals.runs, totals.errors, stages, totals.matches, totals.slots,
+                       totals.objects_copied, totals.bytes_copied)
+        for name, (runs, seconds) in converters:
+            target.log(level, "converter %s: runs=%d seconds=%.6f", name, runs, seconds)
+        for name, stats in cache_stats().items():
+            target.log(level, "cache %s: hits=%d misses=%d hit_rate=%.3f size=%d/%d", name, stats.hits,
+                       stats.misses, _hit_rate(stats), stats.size, stats.maxsize)
+
+    def prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        with self._lock:
+            commands = list(self._commands.items())
+            converters = list(self._converters.items())
+
+        lines = []
+
+        def family(name: str, kind: str, text: str, samples: list[tuple[dict, float]]):
+            lines.append(f"# HELP jsonpath2path_{name} {text}")
+            lines.append(f"# TYPE jsonpath2path_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(str(label))}"' for key, label in labels.items())
+                lines.append(f"jsonpath2path_{name}{{{label_text}}} {value!r}")
+
+        family("command_runs_total", "counter", "Commands applied.",
+               [({"command": command}, totals.runs) for command, totals in commands])
+        family("command_errors_total", "counter", "Commands that raised.",
+               [({"command": command}, totals.errors) for command, totals in commands])
+        family("stage_seconds_total", "counter", "Wall time by command and stage.",
+               [({"command": command, "stage": stage}, seconds)
+                for command, totals in commands for stage, seconds in totals.stages.items()])
+        family("matches_total", "counter", "Nodes picked.",
+               [({"command": command}, totals.matches) for command, totals in commands])
+        family("slots_total", "counter", "Nodes placed in slots.",
+               [({"command": command}, totals.slots) for command, totals in commands])
+        family("copied_objects_total", "counter", "Containers copied on the way to slots.",
+               [({"command": command}, totals.objects_copied) for command, totals in commands])
+        family("copied_bytes_total", "counter", "Bytes of containers copied on the way to slots.",
+               [({"command": command}, totals.bytes_copied) for command, totals in commands])
+        family("converter_runs_total", "counter", "Converter runs.",
+               [({"converter": name}, runs) for name, (runs, _) in converters])
+        family("converter_seconds_total", "counter", "Wall time by converter.",
+               [({"converter": name}, seconds) for name, (_, seconds) in converters])
+        caches = cache_stats()
+        family("cache_hits_total", "counter", "Hits of process-wide caches.",
+               [({"cache": name}, stats.hits) for name, stats in caches.items()])
+        family("cache_misses_total", "counter", "Misses of process-wide caches.",
+               [({"cache": name}, stats.misses) for name, stats in caches.items()])
+        family("cache_hit_ratio", "gauge", "Hit ratio of process-wide caches.",
+               [({"cache": name}, _hit_rate(stats)) for name, stats in caches.items()])
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        """Write `prometheus()` to path atomically, e.g. for the node_exporter textfile collector."""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus())
+        os.replace(temp_path, path)
+
+
+def _hit_rate(stats: CacheStats) -> float:
+    lookups = stats.hits + stats.misses
+    return stats.hits / lookups if lookups else 0.0
+
+
+def _escape(label: str) -> str:
+    return label.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -2,20 +2,43 @@ from __future__ import annotations
 
 import copy
 
-from jsonpath_ng import parse, DatumInContext
+from jsonpath_ng import DatumInContext
 
 from jsonpath2path.common.constants import VIRTUAL_ROOT_EDGE
 from jsonpath2path.common.exceptions import *
 
 
-def new_match(edge: int|str, node: any) -> DatumInContext:
-    if isinstance(edge, str):
-        return parse(f"$.{edge}").find({edge: node})[0]
-    tmp_list = [None for _ in range(edge)] + [node]
-    return parse(f"$[{edge}]").find(tmp_list)[0]
+class PathMatch:
+    """
+    Lightweight stand-in for `DatumInContext`: a node, its edge and the match of its parent (None for the root).
+    """
+    __slots__ = ("value", "edge", "context")
 
+    def __init__(self, value: any, edge: int | str | None = None, context: PathMatch | None = None):
+        self.value = value
+        self.edge = edge
+        self.context = context
+
+
+class CreatedMatch(PathMatch):
+    """
+    A created node and its edge, held directly without parsing a JSONPath or building a parent container.
+    A created node has no parent in any data.
+    """
+    __slots__ = ()
+
+    def __init__(self, edge: int | str, value: any):
+        super().__init__(value, edge)
+
+
+def new_match(edge: int|str, node: any) -> CreatedMatch:
+    return CreatedMatch(edge, node)
+
+
+def get_edge(match: DatumInContext | PathMatch) -> str | int | None:
+    if isinstance(match, PathMatch):
+        return match.edge
 
-def get_edge(match: DatumInContext) -> str | int | None:
     if match.context is None:
         return None
 
@@ -28,7 +51,7 @@ def get_edge(match: DatumInContext) -> str | int | None:
     raise InvalidMatchError(f"Unexpected match type: {match.context.type}")
 
 
-def get_node(match: DatumInContext) -> dict | list | None:
+def get_node(match: DatumInContext | PathMatch) -> dict | list | None:
     if match is not None:
         return copy.deepcopy(match.value)
 
@@ -54,3 +77,25 @@ def is_root(match: DatumInContext) -> bool:
 def unlink(match: DatumInContext) -> None:
     edge = get_edge(match)
     match.context.value.pop(edge)
+
+def unlink_all(matches: list[DatumInContext]) -> None:
+    """
+    Unlink matches from their parents. Dict items are popped by key, and each list is rebuilt once
+    without its matched elements, so removing k of n elements is O(n) rather than O(n*k) pops.
+    """
+    # id -> (list, indices to remove), lists are grouped by identity as they are unhashable.
+    removals: dict[int, tuple[list, set[int]]] = {}
+    for match in matches:
+        parent = match.context.value
+        if isinstance(parent, list):
+            index = get_edge(match)
+            removals.setdefault(id(parent), (parent, set()))[1].add(index % len(parent) if index < 0 else index)
+        else:
+            unlink(match)
+
+    for parent, indices in removals.values():
+        if len(indices) == 1:
+            parent.pop(indices.pop())
+        else:
+            # Rebuild in place, contexts of other matches still refer to this list.
+            parent[:] = [node for i, node in enumerate(parent) if i not in indices]
@@ -1,6 +1,6 @@
-from .register import get_convert_func, register_user_defined_convert
+from .register import get_convert_func, register_user_defined_convert, convert_traits, get_convert_trait
 from .convert_key import *
 from .convert_value import *
 from .convert_type import *
 
-__all__ = ["get_convert_func", "register_user_defined_convert"]
\ No newline at end of file
+__all__ = ["get_convert_func", "register_user_defined_convert", "convert_traits", "get_convert_trait"]
\ No newline at end of file
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from jsonpath2path.common.cache import parse
+from jsonpath2path.common.entities import ConverterData
+from jsonpath2path.common.fastpath import SimplePath, FIELD, ALL_FIELDS, parse_path
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def numeric_array(column: list):
+    """
+    The column as a one-dimensional NumPy array of booleans, integers or floats,
+    None if NumPy is not installed or the column holds anything else.
+    """
+    if numpy is None:
+        return None
+    try:
+        array = numpy.array(column)
+    except (ValueError, TypeError, OverflowError):
+        return None
+    if array.ndim != 1 or array.dtype.kind not in "biuf":
+        return None
+    return array
+
+
+def column_path(jsonpath: any) -> SimplePath | None:
+    """
+    Parser of jsonpath if it addresses fields of dicts only, e.g. `$.price` or `$.sizes.*`, otherwise None.
+    Invalid paths are None too, left to the convert function to report.
+    """
+    if not isinstance(jsonpath, str):
+        return None
+    try:
+        path = parse_path(jsonpath)
+    except Exception:
+        return None
+    if not isinstance(path, SimplePath) or not path.steps:
+        return None
+    if any(kind not in (FIELD, ALL_FIELDS) for kind, _ in path.steps):
+        return None
+    return path
+
+
+def column_slots(path: SimplePath, nodes: list) -> tuple[list[dict], list[str]] | None:
+    """
+    Dicts holding the fields a column path addresses in nodes, and the keys of the fields, in node order.
+    :return: None if a dict is reached from several nodes, such a field is converted once per node
+        when run node by node.
+    """
+    parents = nodes
+    for kind, key in path.steps[:-1]:
+        if kind == FIELD:
+            parents = [parent[key] for parent in parents if isinstance(parent, dict) and key in parent]
+        else:
+            parents = [child for parent in parents if isinstance(parent, dict) for child in parent.values()]
+    kind, key = path.steps[-1]
+    if kind == FIELD:
+        parents = [parent for parent in parents if isinstance(parent, dict) and key in parent]
+    else:
+        parents = [parent for parent in parents if isinstance(parent, dict)]
+    if len(set(map(id, parents))) != len(parents):
+        return None
+
+    if kind == FIELD:
+        return parents, [key] * len(parents)
+    return [parent for parent in parents for _ in range(len(parent))], [edge for parent in parents for edge in parent]
+
+
+def convert_fields(data: ConverterData, jsonpath: str, convert_value: Callable[[any], any]) -> None:
+    """Node by node form of a per-field convert function, replacing each field jsonpath addresses in the nodes."""
+    parser = parse(jsonpath)
+    for node in data.nodes:
+        for match in parser.find(node):
+            value = convert_value(match.value)
+            if value is not match.value:
+                match.context.value[match.path.fields[-1]] = value
+
+
+def field_kernel(field: Callable[..., Callable[[any], any]]) -> Callable[..., list]:
+    """Columnar form of a per-field convert function, from its `field` trait."""
+
+    def kernel(column: list, *args, **kwargs) -> list:
+        convert_value = field(*args, **kwargs)
+        return [convert_value(value) for value in column]
+
+    return kernel
+
+
+def run_columnar(kernel: Callable[..., list], nodes: list, jsonpath: any, *args, **kwargs) -> bool:
+    """
+    Convert the field jsonpath addresses in all nodes at once: gather the values into a column,
+    convert them by `kernel(column, *args, **kwargs)`, and write back the values it changed.
+
+    :param kernel: Columnar form of a convert function, returning a list of the column length,
+        where unchanged values are the original objects.
+    :return: False if the convert function has to run node by node instead, nothing is changed then.
+    """
+    path = column_path(jsonpath)
+    slots = None if path is None else column_slots(path, nodes)
+    if slots is None:
+        return False
+
+    parents, edges = slots
+    column = [parent[edge] for parent, edge in zip(parents, edges)]
+    for parent, edge, old, new in zip(parents, edges, column, kernel(column, *args, **kwargs)):
+        if new is not old:
+            parent[edge] = new
+    return True
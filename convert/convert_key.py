@@ -1,11 +1,121 @@
+from __future__ import annotations
+
 import re
-from typing import List
+from typing import Callable, List
 
+from jsonpath2path.common.cache import key_name_cache
+from jsonpath2path.common.constants import Mutation
 from jsonpath2path.common.entities import ConverterData
-from .register import register_internal_convert
+from .register import register_internal_convert, convert_traits
+
+
+# Supported conventions mapping
+CONVENTIONS = {
+    'camel': 'camelCase',
+    'pascal': 'PascalCase',
+    'snake': 'snake_case',
+    'kebab': 'kebab-case',
+    'upper': 'UPPER_CASE',
+    'lower': 'lower_case',
+    'title': 'Title Case'
+}
+
+_CAMEL_WORD_RE = re.compile('[a-z]+|[A-Z][a-z]*')
+_PASCAL_WORD_RE = re.compile('[A-Z][a-z]*')
+
+
+def _detect_convention(name: str) -> str:
+    """Auto-detect the naming convention of a string."""
+    if '_' in name:
+        return 'snake'
+    elif '-' in name:
+        return 'kebab'
+    elif name.isupper():
+        return 'upper'
+    elif name.istitle():
+        return 'title'
+    elif name.islower():
+        if any(c.isupper() for c in name):
+            return 'camel' if name[0].islower() else 'pascal'
+        return 'lower'
+    return 'unknown'
+
+
+def _split_words(name: str, convention: str) -> List[str]:
+    """Split a name into words based on its convention."""
+    if convention == 'snake':
+        return [w for w in name.split('_') if w]
+    elif convention == 'kebab':
+        return [w for w in name.split('-') if w]
+    elif convention == 'camel':
+        return _CAMEL_WORD_RE.findall(name)
+    elif convention == 'pascal':
+        words = _PASCAL_WORD_RE.findall(name)
+        return [w.lower() for w in words]
+    elif convention == 'upper':
+        return [w.lower() for w in name.split('_') if w]
+    elif convention == 'title':
+        return [w.lower() for w in name.split() if w]
+    else:  # lower or unknown
+        return [name]
+
+
+def _convert_name(name: str, target_conv: str, source_conv: str | None) -> str:
+    """Convert a single name to target convention."""
+    if not name:
+        return name
+
+    src_conv = source_conv or _detect_convention(name)
+    words = _split_words(name, src_conv)
+
+    if not words:
+        return name
+
+    if target_conv == 'camel':
+        return words[0].lower() + ''.join(w.capitalize() for w in words[1:])
+    elif target_conv == 'pascal':
+        return ''.join(w.capitalize() for w in words)
+    elif target_conv == 'snake':
+        return '_'.join(w.lower() for w in words)
+    elif target_conv == 'kebab':
+        return '-'.join(w.lower() for w in words)
+    elif target_conv == 'upper':
+        return '_'.join(w.upper() for w in words)
+    elif target_conv == 'lower':
+        return '_'.join(w.lower() for w in words)
+    elif target_conv == 'title':
+        return ' '.join(w.capitalize() for w in words)
+    return name
+
+
+def _name_converter(*args) -> Callable[[str], str]:
+    """Memoized name conversion for the arguments of `k_rename`, key sets repeat across records."""
+    if len(args) < 1:
+        raise ValueError("Target naming convention argument required")
+
+    target_conv = args[0].lower()
+    if target_conv not in CONVENTIONS:
+        raise ValueError(f"Invalid target convention. Choose from: {list(CONVENTIONS.keys())}")
+
+    source_conv = args[1].lower() if len(args) > 1 else None
+
+    # Names met in this call, in front of the process-wide cache.
+    converted = {}
+
+    def convert_name(name: str) -> str:
+        try:
+            return converted[name]
+        except KeyError:
+            new_name = key_name_cache.get((name, source_conv, target_conv),
+                                          lambda: _convert_name(name, target_conv, source_conv))
+            converted[name] = new_name
+            return new_name
+
+    return convert_name
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.NONE)
 def k_rename(data: ConverterData, *args, **kwargs):
     """
     Convert edge names between different naming conventions.
@@ -24,92 +134,40 @@ def k_rename(data: ConverterData, *args, **kwargs):
             - If not provided, will auto-detect
             - Same options as target convention
     """
-    if len(args) < 1:
-        raise ValueError("Target naming convention argument required")
+    convert_name = _name_converter(*args)
 
-    # Supported conventions mapping
-    CONVENTIONS = {
-        'camel': 'camelCase',
-        'pascal': 'PascalCase',
-        'snake': 'snake_case',
-        'kebab': 'kebab-case',
-        'upper': 'UPPER_CASE',
-        'lower': 'lower_case',
-        'title': 'Title Case'
-    }
+    if data.edges:
+        data.edges = [convert_name(edge) for edge in data.edges]
 
-    target_conv = args[0].lower()
-    if target_conv not in CONVENTIONS:
-        raise ValueError(f"Invalid target convention. Choose from: {list(CONVENTIONS.keys())}")
 
-    source_conv = args[1].lower() if len(args) > 1 else None
+@register_internal_convert
+@convert_traits(mutates=Mutation.NONE)
+def k_rename_deep(data: ConverterData, *args, **kwargs):
+    """
+    Convert string edge names and every key of the nodes, recursively, between naming conventions.
+    Renamed nodes are rebuilt, the picked nodes are left unchanged.
 
-    def detect_convention(name: str) -> str:
-        """Auto-detect the naming convention of a string."""
-        if '_' in name:
-            return 'snake'
-        elif '-' in name:
-            return 'kebab'
-        elif name.isupper():
-            return 'upper'
-        elif name.istitle():
-            return 'title'
-        elif name.islower():
-            if any(c.isupper() for c in name):
-                return 'camel' if name[0].islower() else 'pascal'
-            return 'lower'
-        return 'unknown'
-
-    def split_words(name: str, convention: str) -> List[str]:
-        """Split a name into words based on its convention."""
-        if convention == 'snake':
-            return [w for w in name.split('_') if w]
-        elif convention == 'kebab':
-            return [w for w in name.split('-') if w]
-        elif convention == 'camel':
-            return re.findall('[a-z]+|[A-Z][a-z]*', name)
-        elif convention == 'pascal':
-            words = re.findall('[A-Z][a-z]*', name)
-            return [w.lower() for w in words]
-        elif convention == 'upper':
-            return [w.lower() for w in name.split('_') if w]
-        elif convention == 'title':
-            return [w.lower() for w in name.split() if w]
-        else:  # lower or unknown
-            return [name]
+    Args:
+        data: ConverterData object to modify
+        args[0]: Target naming convention (required), see `k_rename`
+        args[1]: Source naming convention (optional), see `k_rename`
+    """
+    convert_name = _name_converter(*args)
 
-    def convert_name(name: str) -> str:
-        """Convert a single name to target convention."""
-        if not name:
-            return name
-
-        src_conv = source_conv or detect_convention(name)
-        words = split_words(name, src_conv)
-
-        if not words:
-            return name
-
-        if target_conv == 'camel':
-            return words[0].lower() + ''.join(w.capitalize() for w in words[1:])
-        elif target_conv == 'pascal':
-            return ''.join(w.capitalize() for w in words)
-        elif target_conv == 'snake':
-            return '_'.join(w.lower() for w in words)
-        elif target_conv == 'kebab':
-            return '-'.join(w.lower() for w in words)
-        elif target_conv == 'upper':
-            return '_'.join(w.upper() for w in words)
-        elif target_conv == 'lower':
-            return '_'.join(w.lower() for w in words)
-        elif target_conv == 'title':
-            return ' '.join(w.capitalize() for w in words)
-        return name
+    def rename(node: any) -> any:
+        if isinstance(node, dict):
+            return {convert_name(key) if isinstance(key, str) else key: rename(value) for key, value in node.items()}
+        if isinstance(node, list):
+            return [rename(item) for item in node]
+        return node
 
     if data.edges:
-        data.edges = [convert_name(edge) for edge in data.edges]
+        data.edges = [convert_name(edge) if isinstance(edge, str) else edge for edge in data.edges]
+    data.nodes = [rename(node) for node in data.nodes]
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.NONE)
 def k_reformat(data: ConverterData, *args, **kwargs):
     """
     Rename edges in-place.
@@ -1,14 +1,36 @@
+from __future__ import annotations
+
 import re
 from datetime import datetime
-from typing import Union
-
-from jsonpath_ng.ext import parse
+from typing import Callable, Union
 
-from .register import register_internal_convert
+from .columnar import numeric_array, convert_fields
+from .datetimes import datetime_parser, datetime_formatter, memoize
+from .register import register_internal_convert, convert_traits
+from jsonpath2path.common.constants import Mutation
 from jsonpath2path.common.entities import ConverterData
 
+_HEX_COLOR_RE = re.compile(r'^#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})$')
+
+
+def _string_to_number_field(*args, **kwargs) -> Callable[[any], any]:
+    strict = args[0] if len(args) > 0 else True
+
+    def convert_value(value: any) -> any:
+        if isinstance(value, str):
+            try:
+                # Try int first, then float
+                return int(value) if value.isdigit() else float(value)
+            except ValueError:
+                if strict:
+                    raise ValueError(f"Cannot convert '{value}' to number")
+        return value
+
+    return convert_value
+
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_string_to_number_field)
 def t_string_to_number(data: ConverterData, *args, **kwargs):
     """
     Convert string to number (int or float).
@@ -19,22 +41,16 @@ def t_string_to_number(data: ConverterData, *args, **kwargs):
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    strict = args[1] if len(args) > 1 else True
-    parser = parse(args[0])
+    convert_fields(data, args[0], _string_to_number_field(*args[1:], **kwargs))
+
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, str):
-                try:
-                    # Try int first, then float
-                    num = int(match.value) if match.value.isdigit() else float(match.value)
-                    match.context.value[match.path.fields[-1]] = num
-                except ValueError:
-                    if strict:
-                        raise ValueError(f"Cannot convert '{match.value}' to number")
+def _number_to_string_field(*args, **kwargs) -> Callable[[any], any]:
+    format_spec = args[0] if len(args) > 0 else 'g'
+    return lambda value: format(value, format_spec) if isinstance(value, (int, float)) else value
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_number_to_string_field)
 def t_number_to_string(data: ConverterData, *args, **kwargs):
     """
     Convert number to string with optional formatting.
@@ -43,16 +59,22 @@ def t_number_to_string(data: ConverterData, *args, **kwargs):
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    format_spec = args[1] if len(args) > 1 else 'g'
-    parser = parse(args[0])
+    convert_fields(data, args[0], _number_to_string_field(*args[1:], **kwargs))
+
+
+def _number_to_bool_column(column: list, *args, **kwargs) -> list:
+    array = numeric_array(column)
+    if array is not None:
+        return (array != 0).tolist()
+    return list(map(_number_to_bool_field(*args, **kwargs), column))
+
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, (int, float)):
-                match.context.value[match.path.fields[-1]] = format(match.value, format_spec)
+def _number_to_bool_field(*args, **kwargs) -> Callable[[any], any]:
+    return lambda value: bool(value) if isinstance(value, (int, float)) else value
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, columnar=_number_to_bool_column, field=_number_to_bool_field)
 def t_number_to_bool(data: ConverterData, *args, **kwargs):
     """
     Convert number to boolean (0=False, non-zero=True).
@@ -61,15 +83,15 @@ def t_number_to_bool(data: ConverterData, *args, **kwargs):
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    parser = parse(args[0])
+    convert_fields(data, args[0], _number_to_bool_field(*args[1:], **kwargs))
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, (int, float)):
-                match.context.value[match.path.fields[-1]] = bool(match.value)
+
+def _bool_to_number_field(*args, **kwargs) -> Callable[[any], any]:
+    return lambda value: int(value) if isinstance(value, bool) else value
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_bool_to_number_field)
 def t_bool_to_number(data: ConverterData, *args, **kwargs):
     """
     Convert boolean to number (True=1, False=0).
@@ -78,15 +100,31 @@ def t_bool_to_number(data: ConverterData, *args, **kwargs):
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    parser = parse(args[0])
+    convert_fields(data, args[0], _bool_to_number_field(*args[1:], **kwargs))
+
+
+def _datetime_to_timestamp_field(*args, **kwargs) -> Callable[[any], any]:
+    fmt = args[0] if len(args) > 0 else '%Y-%m-%d %H:%M:%S'
+    parse_datetime = datetime_parser(fmt)
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, bool):
-                match.context.value[match.path.fields[-1]] = int(match.value)
+    def convert_value(value: any) -> any:
+        if isinstance(value, str):
+            try:
+                dt = parse_datetime(value)
+                if len(args) > 1:  # Handle timezone if provided
+                    dt = dt.replace(tzinfo=args[1])
+                return dt.timestamp()
+            except ValueError as e:
+                if 'strict' not in kwargs or kwargs['strict']:
+                    raise ValueError(f"Time format mismatch: {e}")
+        return value
+
+    # Log-shaped data repeats timestamps.
+    return memoize(convert_value, str)
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_datetime_to_timestamp_field)
 def t_datetime_to_timestamp(data: ConverterData, *args, **kwargs):
     """
     Convert datetime string to timestamp.
@@ -95,23 +133,30 @@ def t_datetime_to_timestamp(data: ConverterData, *args, **kwargs):
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    fmt = args[1] if len(args) > 1 else '%Y-%m-%d %H:%M:%S'
-    parser = parse(args[0])
+    convert_fields(data, args[0], _datetime_to_timestamp_field(*args[1:], **kwargs))
+
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, str):
-                try:
-                    dt = datetime.strptime(match.value, fmt)
-                    if len(args) > 2:  # Handle timezone if provided
-                        dt = dt.replace(tzinfo=args[2])
-                    match.context.value[match.path.fields[-1]] = dt.timestamp()
-                except ValueError as e:
-                    if 'strict' not in kwargs or kwargs['strict']:
-                        raise ValueError(f"Time format mismatch: {e}")
+def _timestamp_to_datetime_field(*args, **kwargs) -> Callable[[any], any]:
+    fmt = args[0] if len(args) > 0 else '%Y-%m-%d %H:%M:%S'
+    format_datetime = datetime_formatter(fmt)
+
+    def convert_value(value: any) -> any:
+        if isinstance(value, (int, float)):
+            try:
+                dt = datetime.fromtimestamp(value)
+                if len(args) > 1:  # Handle timezone if provided
+                    dt = dt.astimezone(args[1])
+                return format_datetime(dt)
+            except (ValueError, OSError) as e:
+                if 'strict' not in kwargs or kwargs['strict']:
+                    raise ValueError(f"Invalid timestamp: {e}")
+        return value
+
+    return memoize(convert_value, (int, float))
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_timestamp_to_datetime_field)
 def t_timestamp_to_datetime(data: ConverterData, *args, **kwargs):
     """
     Convert timestamp to datetime string.
@@ -120,23 +165,23 @@ def t_timestamp_to_datetime(data: ConverterData, *args, **kwargs):
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    fmt = args[1] if len(args) > 1 else '%Y-%m-%d %H:%M:%S'
-    parser = parse(args[0])
+    convert_fields(data, args[0], _timestamp_to_datetime_field(*args[1:], **kwargs))
+
+
+def _array_to_string_field(*args, **kwargs) -> Callable[[any], any]:
+    separator = args[0] if len(args) > 0 else ', '
+    filter_nulls = args[1] if len(args) > 1 else True
+
+    def convert_value(value: any) -> any:
+        if isinstance(value, list):
+            return separator.join(str(x) for x in value if not (filter_nulls and x is None))
+        return value
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, (int, float)):
-                try:
-                    dt = datetime.fromtimestamp(match.value)
-                    if len(args) > 2:  # Handle timezone if provided
-                        dt = dt.astimezone(args[2])
-                    match.context.value[match.path.fields[-1]] = dt.strftime(fmt)
-                except (ValueError, OSError) as e:
-                    if 'strict' not in kwargs or kwargs['strict']:
-                        raise ValueError(f"Invalid timestamp: {e}")
+    return convert_value
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_array_to_string_field)
 def t_array_to_string(data: ConverterData, *args, **kwargs):
     """
     Convert array to string using join.
@@ -145,18 +190,24 @@ def t_array_to_string(data: ConverterData, *args, **kwargs):
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    separator = args[1] if len(args) > 1 else ', '
-    filter_nulls = args[2] if len(args) > 2 else True
-    parser = parse(args[0])
+    convert_fields(data, args[0], _array_to_string_field(*args[1:], **kwargs))
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, list):
-                items = [str(x) for x in match.value if not (filter_nulls and x is None)]
-                match.context.value[match.path.fields[-1]] = separator.join(items)
+
+def _string_to_array_field(*args, **kwargs) -> Callable[[any], any]:
+    separator = args[0] if len(args) > 0 else None
+    strip_items = args[1] if len(args) > 1 else True
+
+    def convert_value(value: any) -> any:
+        if isinstance(value, str):
+            items = value.split(separator) if separator else list(value)
+            return [x.strip() for x in items] if strip_items else items
+        return value
+
+    return convert_value
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_string_to_array_field)
 def t_string_to_array(data: ConverterData, *args, **kwargs):
     """
     Convert string to array using split.
@@ -165,68 +216,79 @@ def t_string_to_array(data: ConverterData, *args, **kwargs):
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    separator = args[1] if len(args) > 1 else None
-    strip_items = args[2] if len(args) > 2 else True
-    parser = parse(args[0])
+    convert_fields(data, args[0], _string_to_array_field(*args[1:], **kwargs))
+
+
+def _json_string_to_object_field(*args, **kwargs) -> Callable[[any], any]:
+    import json
+    strict = args[0] if len(args) > 0 else True
+
+    def convert_value(value: any) -> any:
+        if isinstance(value, str):
+            try:
+                return json.loads(value)
+            except json.JSONDecodeError:
+                if strict:
+                    raise ValueError("Invalid JSON string")
+        return value
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, str):
-                items = match.value.split(separator) if separator else list(match.value)
-                if strip_items:
-                    items = [x.strip() for x in items]
-                match.context.value[match.path.fields[-1]] = items
+    return convert_value
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_json_string_to_object_field)
 def t_json_string_to_object(data: ConverterData, *args, **kwargs):
     """
     Convert JSON string to Python object.
     Usage: t_json_string_to_object(data, jsonpath[, strict=True])
     """
-    import json
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    strict = args[1] if len(args) > 1 else True
-    parser = parse(args[0])
+    convert_fields(data, args[0], _json_string_to_object_field(*args[1:], **kwargs))
+
+
+def _object_to_json_string_field(*args, **kwargs) -> Callable[[any], any]:
+    import json
+    indent = args[0] if len(args) > 0 else None
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, str):
-                try:
-                    match.context.value[match.path.fields[-1]] = json.loads(match.value)
-                except json.JSONDecodeError:
-                    if strict:
-                        raise ValueError("Invalid JSON string")
+    def convert_value(value: any) -> any:
+        try:
+            return json.dumps(value, indent=indent, ensure_ascii=False)
+        except TypeError:
+            raise ValueError("Object not JSON serializable")
+
+    return convert_value
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_object_to_json_string_field)
 def t_object_to_json_string(data: ConverterData, *args, **kwargs):
     """
     Convert Python object to JSON string.
     Usage: t_object_to_json_string(data, jsonpath[, indent=None])
     """
-    import json
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    indent = args[1] if len(args) > 1 else None
-    parser = parse(args[0])
+    convert_fields(data, args[0], _object_to_json_string_field(*args[1:], **kwargs))
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            try:
-                match.context.value[match.path.fields[-1]] = json.dumps(
-                    match.value,
-                    indent=indent,
-                    ensure_ascii=False
-                )
-            except TypeError:
-                raise ValueError("Object not JSON serializable")
+
+def _hex_to_rgb_field(*args, **kwargs) -> Callable[[any], any]:
+    def convert_value(value: any) -> any:
+        if isinstance(value, str):
+            hex_str = value.lstrip('#')
+            if _HEX_COLOR_RE.fullmatch(hex_str):
+                if len(hex_str) == 3:
+                    hex_str = ''.join([c * 2 for c in hex_str])
+                return tuple(int(hex_str[i:i + 2], 16) for i in (0, 2, 4))
+        return value
+
+    return convert_value
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_hex_to_rgb_field)
 def t_hex_to_rgb(data: ConverterData, *args, **kwargs):
     """
     Convert hex color string to RGB tuple.
@@ -235,18 +297,4 @@ def t_hex_to_rgb(data: ConverterData, *args, **kwargs):
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    parser = parse(args[0])
-    hex_color_re = re.compile(r'^#?([0-9a-fA-F]{3}|[0-9a-fA-F]{6})$')
-
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, str):
-                hex_str = match.value.lstrip('#')
-                if not hex_color_re.fullmatch(hex_str):
-                    continue
-
-                if len(hex_str) == 3:
-                    hex_str = ''.join([c * 2 for c in hex_str])
-                match.context.value[match.path.fields[-1]] = tuple(
-                    int(hex_str[i:i + 2], 16) for i in (0, 2, 4)
-                )
\ No newline at end of file
+    convert_fields(data, args[0], _hex_to_rgb_field(*args[1:], **kwargs))
\ No newline at end of file
@@ -1,15 +1,53 @@
 from __future__ import annotations
 
 import re
+from typing import Callable
 
-from jsonpath_ng.ext import parse
-
+from jsonpath2path.common.cache import parse, lambda_cache
+from jsonpath2path.common.constants import Mutation, MissingPolicy
 from jsonpath2path.common.entities import ConverterData
-from .register import register_internal_convert
+from jsonpath2path.common.fastpath import parse_path
+from .columnar import numeric_array, numpy, convert_fields
+from .register import register_internal_convert, convert_traits
+from .sorting import SortOrder
+
+
+def _compile_lambda(source: str) -> Callable:
+    # Identical sources are evaluated once, in this module as before.
+    return lambda_cache.get(source, lambda: eval(source))
+
+
+def _prepare_lambdas(*positions: int) -> Callable[..., tuple]:
+    """
+    `prepare` trait turning lambda strings at positions of the arguments into functions.
+    Invalid ones are kept, for the convert function to report when it runs.
+    """
+
+    def prepare(*args) -> tuple:
+        args = list(args)
+        for i in positions:
+            if i < len(args) and isinstance(args[i], str) and args[i].startswith('lambda'):
+                try:
+                    args[i] = _compile_lambda(args[i])
+                except (SyntaxError, NameError, ValueError):
+                    pass
+        return tuple(args)
+
+    return prepare
+
+
+def _sort_keys(keys: any) -> any:
+    """Sort keys of a `SortOrder`, with lambda strings compiled."""
+    if isinstance(keys, str) and keys.startswith('lambda'):
+        return _compile_lambda(keys)
+    if isinstance(keys, (list, tuple)):
+        return [_sort_keys(key) for key in keys]
+    return keys
 
 
 # ========== Common value convert ==========
 @register_internal_convert
+@convert_traits(mutates=Mutation.NONE)
 def v_filter(data: ConverterData, *args, **kwargs):
     """
     Filter nodes based on a condition using only args.
@@ -66,7 +104,15 @@ def v_filter(data: ConverterData, *args, **kwargs):
     data.edges = new_edges
 
 
+def _map_mutation(*args) -> Mutation:
+    # Extracting by JSONPath leaves nodes intact, a mapping function may change them.
+    if len(args) > 0 and isinstance(args[0], str) and not args[0].startswith('lambda'):
+        return Mutation.NONE
+    return Mutation.NODES
+
+
 @register_internal_convert
+@convert_traits(mutates=_map_mutation, prepare=_prepare_lambdas(0))
 def v_map(data: ConverterData, *args):
     """
     Transform node values using only args.
@@ -82,10 +128,13 @@ def v_map(data: ConverterData, *args):
         if callable(args[0]):
             map_func = args[0]
         elif str.startswith(args[0], 'lambda'):
-            map_func = eval(args[0])
+            map_func = _compile_lambda(args[0])
         else:
             parser = parse(args[0])
-            map_func = lambda node: parser.find(node)[0].value if parser.find(node) else None
+
+            def map_func(node):
+                matches = parser.find(node)
+                return matches[0].value if matches else None
     except:
         raise ValueError("Mapping argument must be a JSONPath or lambda function string.")
 
@@ -93,6 +142,7 @@ def v_map(data: ConverterData, *args):
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.NONE, prepare=_prepare_lambdas(1))
 def v_sort(data: ConverterData, *args, **kwargs):
     """
         Sort all nodes using only args.
@@ -100,22 +150,34 @@ def v_sort(data: ConverterData, *args, **kwargs):
         Args:
             data: ConverterData with edges and nodes
             args[0]: Reverse (bool, default False)
-            args[1]: JSONPath or lambda function string
+            args[1]: JSONPath, lambda function string or function, or a list of them by precedence,
+                each optionally as a [key, "asc" | "desc"] pair
+            args[2]: Keep only the first N nodes, without sorting all of them (optional)
+            args[3]: Put nodes whose key is missing or null "first" or "last" (default "last")
         """
     reverse = args[0] if len(args) > 0 else False
-    key_func = lambda node: node
-    if len(args) > 1:
-        if str.startswith(args[1], 'lambda'):
-            key_func = eval(args[1])
-        else:
-            parser = parse(args[1])
-            key_func = lambda node: parser.find(node)[0].value
+    keys = args[1] if len(args) > 1 else None
+    limit = args[2] if len(args) > 2 else None
+    missing = args[3] if len(args) > 3 else MissingPolicy.LAST
 
-    data.nodes.sort(key=key_func, reverse=reverse)
+    data.nodes = SortOrder(_sort_keys(keys), reverse, missing).sort(data.nodes, limit)
+    if limit is not None:
+        data.edges = data.edges[:len(data.nodes)]
 
 
 # ========== String value convert ==========
+def _string_trim_field(*args, **kwargs) -> Callable[[any], any]:
+    def convert_value(value: any) -> any:
+        try:
+            return value.strip()
+        except:
+            raise ValueError("Trimmed whitespace from string values!")
+
+    return convert_value
+
+
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_string_trim_field)
 def v_string_trim(data: ConverterData, *args, **kwargs):
     """
     Trim whitespace from string values.
@@ -125,15 +187,21 @@ def v_string_trim(data: ConverterData, *args, **kwargs):
         if len(args) == 0:
             data.nodes = [node.strip() for node in data.nodes]
         else:
-            parser = parse(args[0])
-            for node in data.nodes:
-                for match in parser.find(node):
-                    match.context.value[match.path.fields[-1]] = match.value.strip()
+            convert_fields(data, args[0], _string_trim_field(*args[1:], **kwargs))
     except:
         raise ValueError("Trimmed whitespace from string values!")
 
 
+def _string_replace_field(*args, **kwargs) -> Callable[[any], any]:
+    if len(args) < 2:
+        raise ValueError("Requires jsonpath, pattern and replacement arguments")
+
+    pattern, replacement = args[0], args[1]
+    return lambda value: re.sub(pattern, replacement, value) if isinstance(value, str) else value
+
+
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_string_replace_field)
 def v_string_replace(data: ConverterData, *args, **kwargs):
     """
     Replace substring using regex.
@@ -142,18 +210,19 @@ def v_string_replace(data: ConverterData, *args, **kwargs):
     if len(args) < 3:
         raise ValueError("Requires jsonpath, pattern and replacement arguments")
 
-    pattern, replacement = args[1], args[2]
-    parser = parse(args[0])
+    convert_fields(data, args[0], _string_replace_field(*args[1:], **kwargs))
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, str):
-                match.context.value[match.path.fields[-1]] = re.sub(
-                    pattern, replacement, match.value
-                )
+
+def _string_truncate_field(*args, **kwargs) -> Callable[[any], any]:
+    if len(args) < 1:
+        raise ValueError("Requires jsonpath and max_length arguments")
+
+    max_len = int(args[0])
+    return lambda value: value[:max_len] if isinstance(value, str) and len(value) > max_len else value
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_string_truncate_field)
 def v_string_truncate(data: ConverterData, *args, **kwargs):
     """
     Truncate string to specified length.
@@ -162,17 +231,17 @@ def v_string_truncate(data: ConverterData, *args, **kwargs):
     if len(args) < 2:
         raise ValueError("Requires jsonpath and max_length arguments")
 
-    max_len = int(args[1])
-    parser = parse(args[0])
-
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, str) and len(match.value) > max_len:
-                match.context.value[match.path.fields[-1]] = match.value[:max_len]
+    convert_fields(data, args[0], _string_truncate_field(*args[1:], **kwargs))
 
 
 # ========== Number value convert ==========
+def _number_round_field(*args, **kwargs) -> Callable[[any], any]:
+    decimals = int(args[0]) if len(args) > 0 else 0
+    return lambda value: round(value, decimals) if isinstance(value, (int, float)) else value
+
+
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_number_round_field)
 def v_number_round(data: ConverterData, *args, **kwargs):
     """
     Round numeric values.
@@ -181,16 +250,35 @@ def v_number_round(data: ConverterData, *args, **kwargs):
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    decimals = int(args[1]) if len(args) > 1 else 0
-    parser = parse(args[0])
+    convert_fields(data, args[0], _number_round_field(*args[1:], **kwargs))
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, (int, float)):
-                match.context.value[match.path.fields[-1]] = round(match.value, decimals)
+
+def _units(*args) -> tuple[float, float]:
+    if len(args) < 1:
+        raise ValueError("Requires jsonpath and factor arguments")
+
+    factor = float(args[0])
+    offset = float(args[1]) if len(args) > 1 else 0.0
+    return factor, offset
+
+
+def _convert_units_field(*args, **kwargs) -> Callable[[any], any]:
+    factor, offset = _units(*args)
+    return lambda value: value * factor + offset if isinstance(value, (int, float)) else value
+
+
+def _convert_units_column(column: list, *args, **kwargs) -> list:
+    factor, offset = _units(*args)
+    array = numeric_array(column)
+    if array is None:
+        return [value * factor + offset if isinstance(value, (int, float)) else value for value in column]
+    # Overflow gives inf, as Python floats do.
+    with numpy.errstate(over="ignore", invalid="ignore"):
+        return (array * factor + offset).tolist()
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, columnar=_convert_units_column, field=_convert_units_field)
 def v_number_convert_units(data: ConverterData, *args, **kwargs):
     """
     Convert units using linear transformation (x * factor + offset).
@@ -199,18 +287,20 @@ def v_number_convert_units(data: ConverterData, *args, **kwargs):
     if len(args) < 2:
         raise ValueError("Requires jsonpath and factor arguments")
 
-    factor = float(args[1])
-    offset = float(args[2]) if len(args) > 2 else 0.0
-    parser = parse(args[0])
-
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, (int, float)):
-                match.context.value[match.path.fields[-1]] = match.value * factor + offset
+    convert_fields(data, args[0], _convert_units_field(*args[1:], **kwargs))
 
 
 # ========== Null value convert ==========
+def _null_to_default_field(*args, **kwargs) -> Callable[[any], any]:
+    if len(args) < 1:
+        raise ValueError("Requires jsonpath and default_value arguments")
+
+    default_value = args[0]
+    return lambda value: default_value if value is None else value
+
+
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_null_to_default_field)
 def v_null_to_default(data: ConverterData, *args, **kwargs):
     """
     Replace null values with default value.
@@ -219,16 +309,11 @@ def v_null_to_default(data: ConverterData, *args, **kwargs):
     if len(args) < 2:
         raise ValueError("Requires jsonpath and default_value arguments")
 
-    default_value = args[1]
-    parser = parse(args[0])
-
-    for node in data.nodes:
-        for match in parser.find(node):
-            if match.value is None:
-                match.context.value[match.path.fields[-1]] = default_value
+    convert_fields(data, args[0], _null_to_default_field(*args[1:], **kwargs))
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS)
 def v_null_drop(data: ConverterData, *args, **kwargs):
     """
     Remove fields with null values.
@@ -246,46 +331,136 @@ def v_null_drop(data: ConverterData, *args, **kwargs):
 
 
 # ========== List value convert ==========
+_NO_KEY = object()
+
+
+class _Collisions(list):
+    """Kept keys of equal hash, after the first."""
+
+
+def _deep_hash(value: any) -> int:
+    """Hash of value consistent with `==`, for dicts, lists and sets too."""
+    if isinstance(value, dict):
+        return hash(frozenset((k, _deep_hash(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return hash(tuple(_deep_hash(item) for item in value))
+    if isinstance(value, (set, frozenset)):
+        return hash(frozenset(_deep_hash(item) for item in value))
+    try:
+        return hash(value)
+    except TypeError:
+        return 0  # Compared one by one.
+
+
+def _unique_key(key: any) -> Callable[[any], any] | None:
+    if key is None or callable(key):
+        return key
+    if isinstance(key, str):
+        parser = parse_path(key)
+
+        def key_func(item: any) -> any:
+            matches = parser.find(item)
+            return matches[0].value if matches else _NO_KEY
+
+        return key_func
+    if isinstance(key, (list, tuple)):
+        fields = tuple(key)
+        return lambda item: tuple(item.get(field) for field in fields) if isinstance(item, dict) else _NO_KEY
+    raise ValueError("Key must be a JSONPath, a list of fields or a function")
+
+
+def _unique(items: list, key: Callable[[any], any] | None = None) -> list:
+    """
+    Items without duplicates, in order of first occurrence, in linear time.
+    Items equal by `==`, or by `key(item)`, are duplicates; unhashable ones, e.g. dicts and lists, are hashed by content.
+    Items a key function returns `_NO_KEY` for are kept.
+
+    Memory: a hash and a reference per distinct item, items are not copied.
+    """
+    if key is None:
+        try:
+            return list(dict.fromkeys(items))
+        except TypeError:
+            pass
+
+    # Kept keys by their hash, several in a `_Collisions`.
+    seen = {}
+    result = []
+    for item in items:
+        item_key = item if key is None else key(item)
+        if item_key is not _NO_KEY:
+            item_hash = _deep_hash(item_key)
+            kept = seen.get(item_hash, _NO_KEY)
+            if kept is _NO_KEY:
+                seen[item_hash] = item_key
+            else:
+                bucket = kept if type(kept) is _Collisions else _Collisions([kept])
+                if any(other is item_key or other == item_key for other in bucket):
+                    continue
+                bucket.append(item_key)
+                seen[item_hash] = bucket
+        result.append(item)
+    return result
+
+
+def _list_unique_field(*args, **kwargs) -> Callable[[any], any]:
+    key = _unique_key(args[0] if len(args) > 0 else None)
+    return lambda value: _unique(value, key) if isinstance(value, list) else value
+
+
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_list_unique_field)
 def v_list_unique(data: ConverterData, *args, **kwargs):
     """
-    Remove duplicate values from list.
-    Usage: v_list_unique(data, jsonpath)
+    Remove duplicate values from list, keeping the first of each in order.
+    Usage: v_list_unique(data, jsonpath[, key])
+    - key: JSONPath in the elements, or list of fields of dict elements, to compare by instead of whole elements.
+      Elements it does not match are kept.
+    Dicts and lists are compared by content. Memory grows with distinct elements only, a hash and a reference each.
     """
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    parser = parse(args[0])
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, list):
-                match.context.value[match.path.fields[-1]] = list(set(match.value))
+    convert_fields(data, args[0], _list_unique_field(*args[1:], **kwargs))
+
+
+def _list_sort_field(*args, **kwargs) -> Callable[[any], any]:
+    reverse = args[0] if len(args) > 0 else False
+    keys = args[1] if len(args) > 1 else None
+    limit = args[2] if len(args) > 2 else None
+    missing = args[3] if len(args) > 3 else MissingPolicy.LAST
+
+    order = SortOrder(_sort_keys(keys), reverse, missing)
+    return lambda value: order.sort(value, limit) if isinstance(value, list) else value
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, prepare=_prepare_lambdas(2), field=_list_sort_field)
 def v_list_sort(data: ConverterData, *args, **kwargs):
     """
     Sort list elements.
-    Usage: v_list_sort(data, jsonpath, reverse=False, key=None)
+    Usage: v_list_sort(data, jsonpath, reverse=False, key=None, limit=None, missing="last")
+    - key: JSONPath in the elements, lambda function string or function, or a list of them by precedence,
+      each optionally as a [key, "asc" | "desc"] pair
+    - limit: keep only the first N elements, without sorting all of them
+    - missing: put elements whose key is missing or null "first" or "last"
     """
     if len(args) < 1:
         raise ValueError("Requires jsonpath argument")
 
-    reverse = args[1] if len(args) > 1 else False
-    key = args[2] if len(args) > 2 else None
-    parser = parse(args[0])
+    convert_fields(data, args[0], _list_sort_field(*args[1:], **kwargs))
 
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, list):
-                match.context.value[match.path.fields[-1]] = sorted(
-                    match.value,
-                    key=key,
-                    reverse=reverse
-                )
+
+def _list_filter_field(*args, **kwargs) -> Callable[[any], any]:
+    if len(args) < 1:
+        raise ValueError("Requires jsonpath and condition_func arguments")
+
+    condition = args[0]  # Can be function or lambda
+    return lambda value: [x for x in value if condition(x)] if isinstance(value, list) else value
 
 
 @register_internal_convert
+@convert_traits(mutates=Mutation.FIELDS, field=_list_filter_field)
 def v_list_filter(data: ConverterData, *args, **kwargs):
     """
     Filter list elements by condition.
@@ -294,12 +469,4 @@ def v_list_filter(data: ConverterData, *args, **kwargs):
     if len(args) < 2:
         raise ValueError("Requires jsonpath and condition_func arguments")
 
-    parser = parse(args[0])
-    condition = args[1]  # Can be function or lambda
-
-    for node in data.nodes:
-        for match in parser.find(node):
-            if isinstance(match.value, list):
-                match.context.value[match.path.fields[-1]] = [
-                    x for x in match.value if condition(x)
-                ]
+    convert_fields(data, args[0], _list_filter_field(*args[1:], **kwargs))
\ No newline at end of file
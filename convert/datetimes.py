@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from operator import attrgetter
+from typing import Callable
+
+from jsonpath2path.common.cache import LRUCache, datetime_cache
+
+# Directives of numeric fields of fixed width: datetime attribute and digit count.
+_FIELDS = {
+    'Y': ('year', 4),
+    'm': ('month', 2),
+    'd': ('day', 2),
+    'H': ('hour', 2),
+    'M': ('minute', 2),
+    'S': ('second', 2),
+    'f': ('microsecond', 6),
+}
+
+# Layouts `datetime.fromisoformat()` and `datetime.isoformat()` handle, as directives and separators.
+_ISO_LAYOUTS = {
+    ('Y', '-', 'm', '-', 'd'): None,
+    ('Y', '-', 'm', '-', 'd', ' ', 'H', ':', 'M', ':', 'S'): 'seconds',
+    ('Y', '-', 'm', '-', 'd', 'T', 'H', ':', 'M', ':', 'S'): 'seconds',
+    ('Y', '-', 'm', '-', 'd', ' ', 'H', ':', 'M', ':', 'S', '.', 'f'): 'microseconds',
+    ('Y', '-', 'm', '-', 'd', 'T', 'H', ':', 'M', ':', 'S', '.', 'f'): 'microseconds',
+}
+
+# Parsed formats, formats are few in a process.
+_formats = LRUCache(64)
+
+# Size of the memo of converted values of one converter run.
+MEMO_SIZE = 4096
+
+_MISSING = object()
+
+
+def _tokenize(fmt: str) -> list[tuple[bool, str]] | None:
+    """
+    fmt as (True, directive letter) and (False, literal string) tokens,
+    None if it has other directives than `_FIELDS`.
+    """
+    tokens, literal, i = [], '', 0
+    while i < len(fmt):
+        if fmt[i] != '%':
+            literal += fmt[i]
+        elif fmt[i + 1:i + 2] == '%':
+            literal += '%'
+            i += 1
+        elif fmt[i + 1:i + 2] in _FIELDS:
+            if literal:
+                tokens.append((False, literal))
+                literal = ''
+            tokens.append((True, fmt[i + 1]))
+            i += 1
+        else:
+            return None
+        i += 1
+    if literal:
+        tokens.append((False, literal))
+    return tokens
+
+
+class DatetimeFormat:
+    """
+    A `strptime()`/`strftime()` format, with fast paths for formats of fixed-width numeric fields,
+    e.g. `%Y-%m-%d %H:%M:%S` or `%d/%m/%Y`. Results and errors are those of `strptime()` and `strftime()`,
+    values off the fast paths are handed to them.
+    """
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+        self._regex = None
+        self._fields = []
+        self._template = None
+        self._values = None
+        self._iso = False
+        self._timespec = None
+
+        tokens = _tokenize(fmt)
+        directives = [text for is_directive, text in tokens or [] if is_directive]
+        if tokens is None or not directives or len(set(directives)) != len(directives):
+            return
+
+        pattern, template = '', ''
+        for is_directive, text in tokens:
+            if is_directive:
+                name, width = _FIELDS[text]
+                pattern += f'([0-9]{{{width}}})'
+                template += f'%0{width}d'
+                self._fields.append(name)
+            else:
+                pattern += re.escape(text)
+                template += text.replace('%', '%%')
+        self._regex = re.compile(pattern)
+        self._template = template
+        getter = attrgetter(*self._fields)
+        self._values = getter if len(self._fields) > 1 else lambda dt: (getter(dt),)
+
+        layout = tuple(text for _, text in tokens)
+        if layout in _ISO_LAYOUTS:
+            self._iso = True
+            self._timespec = _ISO_LAYOUTS[layout]
+
+    @property
+    def fixed(self) -> bool:
+        """Whether the format has fixed-width numeric fields only, independent of the locale."""
+        return self._regex is not None
+
+    def parse(self, value: str) -> datetime:
+        """Same as `datetime.strptime(value, fmt)`."""
+        if self._regex is not None:
+            match = self._regex.fullmatch(value)
+            if match is not None:
+                try:
+                    if self._iso:
+                        return datetime.fromisoformat(value)
+                    fields = dict(zip(self._fields, map(int, match.groups())))
+                    fields.setdefault('year', 1900)
+                    fields.setdefault('month', 1)
+                    fields.setdefault('day', 1)
+                    return datetime(**fields)
+                except ValueError:
+                    pass  # Out of range, strptime() reports it.
+        return datetime.strptime(value, self.fmt)
+
+    def format(self, dt: datetime) -> str:
+        """Same as `dt.strftime(fmt)`."""
+        # strftime() does not pad years before 1000 on every platform.
+        if self._template is None or dt.year < 1000:
+            return dt.strftime(self.fmt)
+        if self._iso:
+            if self._timespec is None:
+                return dt.date().isoformat()
+            if dt.tzinfo is not None:
+                dt = dt.replace(tzinfo=None)
+            return dt.isoformat(self.fmt[8], self._timespec)
+        return self._template % self._values(dt)
+
+
+def get_format(fmt: str) -> DatetimeFormat:
+    """Parsed fmt, cached."""
+    return _formats.get(fmt, lambda: DatetimeFormat(fmt))
+
+
+def datetime_parser(fmt: str) -> Callable[[str], datetime]:
+    """
+    Same as `lambda value: datetime.strptime(value, fmt)`.
+    Values parsed by fixed formats are cached in `datetime_cache`, others may depend on the locale.
+    """
+    if not isinstance(fmt, str):
+        return lambda value: datetime.strptime(value, fmt)
+    parser = get_format(fmt)
+    if not parser.fixed:
+        return parser.parse
+    return lambda value: datetime_cache.get((value, fmt), lambda: parser.parse(value))
+
+
+def datetime_formatter(fmt: str) -> Callable[[datetime], str]:
+    """Same as `lambda dt: dt.strftime(fmt)`."""
+    if not isinstance(fmt, str):
+        return lambda dt: dt.strftime(fmt)
+    return get_format(fmt).format
+
+
+def memoize(convert_value: Callable[[any], any], types: type | tuple[type, ...]) -> Callable[[any], any]:
+    """
+    Memo of recent results of convert_value for values of types, for one converter run over repeating values.
+    Results depending on more than the value, e.g. the local timezone, stay valid within a run only.
+    Exceptions are not memoized.
+    """
+    memo = {}
+
+    def convert(value: any) -> any:
+        if not isinstance(value, types):
+            return convert_value(value)
+        result = memo.get(value, _MISSING)
+        if result is not _MISSING:
+            return result
+        result = convert_value(value)
+        if len(memo) >= MEMO_SIZE:
+            memo.clear()
+        memo[value] = result
+        return result
+
+    return convert
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+from typing import Callable
+
+from jsonpath2path.common.fastpath import SimplePath, ALL_FIELDS
+from .columnar import column_path, column_slots
+from .register import get_convert_trait
+
+
+def _may_write_into(written: SimplePath, read: SimplePath) -> bool:
+    # Replacing a field `written` addresses may replace a container on the way to the fields `read` addresses.
+    if len(written.steps) >= len(read.steps):
+        return False
+    return all(w_kind == ALL_FIELDS or r_kind == ALL_FIELDS or w_key == r_key
+               for (w_kind, w_key), (r_kind, r_key) in zip(written.steps, read.steps))
+
+
+class FusedConverters:
+    """
+    Consecutive per-field convert functions, those with a `field` trait, run in one pass over the picked nodes:
+    the fields each JSONPath addresses are resolved once, instead of once per convert function and node.
+    """
+
+    def __init__(self, converters: list[tuple[Callable, tuple]], paths: list[SimplePath]):
+        """
+        :param converters: Convert functions with their params, the JSONPath first.
+        :param paths: Parsed JSONPath of each convert function.
+        """
+        self.converters = converters
+        self._paths = {params[0]: path for (_, params), path in zip(converters, paths)}
+        self.jsonpaths = list(self._paths)
+
+    def run(self, nodes: list) -> bool:
+        """
+        Convert the fields of nodes by each convert function in turn.
+        :return: False if they have to run one by one instead, nothing is changed then.
+        """
+        slots = {}
+        for jsonpath, path in self._paths.items():
+            slots[jsonpath] = column_slots(path, nodes)
+            if slots[jsonpath] is None:
+                return False
+
+        for convert_func, params in self.converters:
+            convert_value = get_convert_trait(convert_func, "field")(*params[1:])
+            for parent, edge in zip(*slots[params[0]]):
+                old = parent[edge]
+                new = convert_value(old)
+                if new is not old:
+                    parent[edge] = new
+        return True
+
+    def __len__(self):
+        return len(self.converters)
+
+
+def fuse(converters: list[tuple[Callable, tuple]]) -> list[tuple[Callable, tuple] | FusedConverters]:
+    """
+    Group runs of per-field convert functions of a converter chain, a run ends where a convert function
+    would read fields inside one an earlier one of the run replaces.
+    :param converters: Convert functions with their params.
+    :return: The chain, where each run of two or more is a `FusedConverters`.
+    """
+    steps, run, paths = [], [], []
+
+    def flush():
+        if len(run) > 1:
+            steps.append(FusedConverters(list(run), list(paths)))
+        else:
+            steps.extend(run)
+        run.clear()
+        paths.clear()
+
+    for convert_func, params in converters:
+        path = None
+        if get_convert_trait(convert_func, "field") is not None and len(params) > 0:
+            path = column_path(params[0])
+        if path is None:
+            flush()
+            steps.append((convert_func, params))
+            continue
+        if any(_may_write_into(written, path) for written in paths):
+            flush()
+        run.append((convert_func, params))
+        paths.append(path)
+    flush()
+    return steps
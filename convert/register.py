@@ -1,8 +1,18 @@
 from typing import Callable
 
+from jsonpath2path.common.constants import Mutation
+
 INTERNAL_CONVERT_MAP = {}
 USER_DEFINED_CONVERT_MAP = {}
 
+CONVERT_TRAITS_ATTR = "__convert_traits__"
+# Unknown convert functions may change anything inside the nodes, run node by node, and take arguments as given.
+# `columnar`: function converting a whole column of picked nodes, see `convert.columnar.run_columnar()`.
+# `prepare`: function compiling the arguments once, e.g. lambda strings, so compiled commands reuse them.
+# `field`: function of the arguments after the JSONPath, returning the conversion of one field value. Declaring it
+# states the convert function only replaces fields its JSONPath addresses, one by one, see `convert.fusion`.
+DEFAULT_CONVERT_TRAITS = {"mutates": Mutation.NODES, "columnar": None, "prepare": None, "field": None}
+
 
 def register_internal_convert(func: Callable) -> Callable:
     name = func.__name__
@@ -23,5 +33,21 @@ def register_user_defined_convert(name: str = None) -> Callable:
     return decorator
 
 
+def convert_traits(**traits) -> Callable:
+    """
+    Annotations declaring how a conversion method behaves, e.g. `@convert_traits(mutates=Mutation.FIELDS)`.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        setattr(func, CONVERT_TRAITS_ATTR, {**getattr(func, CONVERT_TRAITS_ATTR, {}), **traits})
+        return func
+
+    return decorator
+
+
+def get_convert_trait(func: Callable, trait: str) -> any:
+    return getattr(func, CONVERT_TRAITS_ATTR, {}).get(trait, DEFAULT_CONVERT_TRAITS.get(trait))
+
+
 def get_convert_func(name: str) -> Callable:
-    return USER_DEFINED_CONVERT_MAP.get(name, INTERNAL_CONVERT_MAP.get(name))
+    return USER_DEFINED_CONVERT_MAP.get(name, INTERNAL_CONVERT_MAP.get(name))
\ No newline at end of file
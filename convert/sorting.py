@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import heapq
+from typing import Callable
+
+from jsonpath2path.common.constants import MissingPolicy
+from jsonpath2path.common.fastpath import SimplePath, FIELD, parse_path
+
+_MISSING = object()
+
+_DIRECTIONS = {"asc": False, "desc": True}
+
+
+def _accessor(key: any) -> Callable[[any], any]:
+    """Function extracting the sort key of an item, `_MISSING` if a JSONPath key does not match."""
+    if key is None:
+        return lambda item: item
+    if callable(key):
+        return key
+    if not isinstance(key, str):
+        raise ValueError("Sort key must be a JSONPath or a function")
+
+    parser = parse_path(key)
+    if isinstance(parser, SimplePath) and all(kind == FIELD for kind, _ in parser.steps):
+        fields = [field for _, field in parser.steps]
+
+        def get_field(item: any) -> any:
+            for field in fields:
+                if not isinstance(item, dict) or field not in item:
+                    return _MISSING
+                item = item[field]
+            return item
+
+        return get_field
+
+    def get_match(item: any) -> any:
+        matches = parser.find(item)
+        return matches[0].value if matches else _MISSING
+
+    return get_match
+
+
+class _Ordered:
+    """Sort keys of all levels of an item, ordered by the direction of each level."""
+    __slots__ = ("keys", "directions")
+
+    def __init__(self, keys: tuple, directions: tuple):
+        self.keys = keys
+        self.directions = directions
+
+    def __eq__(self, other: _Ordered) -> bool:
+        return self.keys == other.keys
+
+    def __lt__(self, other: _Ordered) -> bool:
+        for key, other_key, descending in zip(self.keys, other.keys, self.directions):
+            if key != other_key:
+                return other_key < key if descending else key < other_key
+        return False
+
+
+class SortOrder:
+    """
+    Ordering of items by one or more keys, each ascending or descending.
+
+    Keys are extracted once per item, JSONPath keys of child fields by plain dict access.
+    Items whose key is missing or null go first or last, whatever the direction.
+    """
+
+    def __init__(self, keys: any = None, reverse: bool = False, missing: MissingPolicy | str = MissingPolicy.LAST):
+        """
+        :param keys: Sort key, or list of sort keys by precedence. A key is None for the item itself,
+            a JSONPath in the item or a function of the item, optionally as a `[key, "asc" | "desc"]` pair.
+        :param reverse: Reverse the direction of every key.
+        :param missing: Where items whose key is missing or null go, `MissingPolicy` or its name.
+        """
+        if not isinstance(keys, (list, tuple)) or self._is_pair(keys):
+            keys = [keys]
+        self._accessors, self._directions = [], []
+        for key in keys:
+            descending = False
+            if self._is_pair(key):
+                key, descending = key[0], _DIRECTIONS[key[1].lower()]
+            self._accessors.append(_accessor(key))
+            self._directions.append(descending != bool(reverse))
+
+        if isinstance(missing, str):
+            try:
+                missing = MissingPolicy[missing.upper()]
+            except KeyError:
+                raise ValueError(f"Invalid missing policy {missing}, choose from: first, last")
+        self._missing_last = missing == MissingPolicy.LAST
+
+    @staticmethod
+    def _is_pair(key: any) -> bool:
+        return (isinstance(key, (list, tuple)) and len(key) == 2 and isinstance(key[1], str)
+                and key[1].lower() in _DIRECTIONS)
+
+    def _column(self, items: list, level: int) -> list:
+        """Sort keys of items at level, as (flag, key) where missing keys are present."""
+        column = list(map(self._accessors[level], items))
+        if not any(key is None or key is _MISSING for key in column):
+            return column
+        # The flag places missing keys, after the direction of the level is applied.
+        missing_flag = int(self._missing_last != self._directions[level])
+        return [(missing_flag, None) if key is None or key is _MISSING else (1 - missing_flag, key) for key in column]
+
+    def sort(self, items: list, limit: int | None = None) -> list:
+        """
+        Items in order, as a new list. Sorting is stable.
+        :param limit: Keep only the first limit items, selected without sorting all items.
+        """
+        if limit is not None and (not isinstance(limit, int) or limit < 0):
+            raise ValueError("Limit must be a non-negative integer")
+
+        columns = [self._column(items, level) for level in range(len(self._accessors))]
+        indices = range(len(items))
+        if limit is not None and limit < len(items):
+            if len(columns) == 1:
+                select = heapq.nlargest if self._directions[0] else heapq.nsmallest
+                order = select(limit, indices, key=columns[0].__getitem__)
+            else:
+                directions = tuple(self._directions)
+                order = heapq.nsmallest(limit, indices,
+                                        key=lambda i: _Ordered(tuple(column[i] for column in columns), directions))
+        else:
+            # Stable sorts from the least significant key up.
+            order = list(indices)
+            for column, descending in reversed(list(zip(columns, self._directions))):
+                order.sort(key=column.__getitem__, reverse=descending)
+        return [items[i] for i in order]
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from jsonpath_ng.ext import parse
-from jsonpath_ng import DatumInContext
+from copy import deepcopy
 
-from jsonpath2path.common.constants import AssignType
+from jsonpath_ng import DatumInContext, JSONPath
+
+from jsonpath2path.common.fastpath import parse_path
+from jsonpath2path.common.constants import AssignType, ROOT_JSON_PATH
 from jsonpath2path.common.exceptions import *
 from jsonpath2path.common.utils import add_virtual_root, get_real_data
 
@@ -14,17 +16,28 @@ class SlotAssigner:
         self._assign_type = None
         self._jsonpath = None
         self._parser = None
+        # In Occupy mode, the last edge of jsonpath replaces the edges of the nodes.
+        self._occupy_edge = None
+        # Only occupying `$` needs the target wrapped in a virtual root, other slots are matched in place.
+        self._virtual_root = False
 
         # Nodes and edges to be assigned to slots.
         self._nodes = None
         self._edges = None
         # In Occupy mode, edges are supplied via jsonpath (replace original edges).
         self._new_edges = None
+        # Nodes placed in slots by the last `to()`.
+        self.written = 0
 
-    def assign(self, jsonpath: str, assign_type: AssignType=AssignType.OCCUPY) -> SlotAssigner:
+    def assign(self, jsonpath: str, assign_type: AssignType=AssignType.OCCUPY,
+               compiled: tuple[JSONPath, str | None, bool] = None) -> SlotAssigner:
         self._jsonpath = jsonpath
         self._assign_type = assign_type
-        self._build_parser()
+        if compiled is None:
+            self._build_parser()
+        else:
+            # Reuse the parser built by `build_parser()`, e.g. from a compiled command.
+            self._parser, self._occupy_edge, self._virtual_root = compiled
 
         return self
 
@@ -59,8 +72,14 @@ class SlotAssigner:
         return data
 
     def _to(self, data):
-        # Add virtual root node to handles whole-JSON replacement.
-        assign_data = add_virtual_root(data=data)
+        self.written = 0
+        if self._occupy_edge is not None:
+            self._new_edges = [self._occupy_edge for _ in range(len(self._edges))]
+        else:
+            self._new_edges = self._edges
+
+        # Add virtual root node to handles whole-JSON replacement, other slots are assigned in place.
+        assign_data = add_virtual_root(data=data) if self._virtual_root else data
 
         # JsonPath match.
         matches = self._parser.find(assign_data)
@@ -78,34 +97,54 @@ class SlotAssigner:
             self._n_to_n(matches)
         else:
             raise NodeToSlotError(f"Invalid number of nodes({len(self._nodes)}) or slots({len(matches)})")
-
-        # Update to target data.
-        assign_data = get_real_data(assign_data)
-        data.update(assign_data)
+        self.written = max(len(self._nodes), len(matches))
+
+        if self._virtual_root:
+            # Update to target data.
+            assign_data = get_real_data(assign_data)
+            if isinstance(data, dict) and isinstance(assign_data, dict):
+                data.update(assign_data)
+            elif isinstance(data, list) and isinstance(assign_data, list):
+                data[:] = assign_data
+            else:
+                raise NodeToSlotError(f"Node of type `{type(assign_data).__name__}` cannot replace "
+                                      f"target data of type `{type(data).__name__}`")
 
     def _build_parser(self):
-        if self._jsonpath is None:
+        self._parser, self._occupy_edge, self._virtual_root = self.build_parser(self._jsonpath, self._assign_type)
+
+    @staticmethod
+    def build_parser(jsonpath: str, assign_type: AssignType) -> tuple[JSONPath, str | None, bool]:
+        """
+        Build the slot parser for jsonpath, independent of the nodes to be assigned.
+        :return: JSONPath parser, in Occupy mode the edge name replacing the node edges,
+            and whether the parser matches the target wrapped in a virtual root.
+        """
+        if jsonpath is None:
             raise InvalidJsonPathError("Use `assign()` or `path` to set JSONPath first.")
-        if self._assign_type is None:
+        if assign_type is None:
             raise InvalidAssignTypeError("Use `assign()` or `assign_type` to set assign type first.")
 
         # Add virtual root node to handles whole-JSON replacement.
-        virtual_path = add_virtual_root(jsonpath=self._jsonpath)
+        virtual_path = add_virtual_root(jsonpath=jsonpath)
 
-        if self._assign_type == AssignType.OCCUPY:
+        edge = None
+        if assign_type == AssignType.OCCUPY:
             # Replace occupy mode to mount mode with specified edge name.
             virtual_path, edge = virtual_path.rsplit('.', 1)
-            self._new_edges = [edge for _ in range(len(self._edges))]
-        elif self._assign_type == AssignType.MOUNT:
-            self._new_edges = self._edges
-        else:
-            raise InvalidAssignTypeError(f"Unknown assign type {self._assign_type}")
+        elif assign_type != AssignType.MOUNT:
+            raise InvalidAssignTypeError(f"Unknown assign type {assign_type}")
+
+        # Slots below the virtual root are matched on the target itself.
+        virtual_root = virtual_path == ROOT_JSON_PATH
+        if not virtual_root:
+            virtual_path = ROOT_JSON_PATH + virtual_path[len(add_virtual_root(jsonpath=ROOT_JSON_PATH)):]
 
         # Create JSONPath parser
         try:
-            self._parser = parse(virtual_path)
+            return parse_path(virtual_path), edge, virtual_root
         except:
-            raise InvalidJsonPathError(f"Invalid jsonpath: {self._jsonpath}")
+            raise InvalidJsonPathError(f"Invalid jsonpath: {jsonpath}")
 
     def _one_to_one(self, slot: DatumInContext):
         edge, node = self._new_edges[0], self._nodes[0]
@@ -113,8 +152,9 @@ class SlotAssigner:
 
     def _one_to_n(self, slots: list[DatumInContext]):
         edge, node = self._new_edges[0], self._nodes[0]
-        for slot in slots:
-            self._node_to_slot(edge, node, slot)
+        # The same node lands in several slots, each extra slot gets its own copy.
+        for i, slot in enumerate(slots):
+            self._node_to_slot(edge, node if i == 0 else deepcopy(node), slot)
 
     def _n_to_one(self, slot: DatumInContext):
         for edge, node in zip(self._new_edges, self._nodes):
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from .compiler import CompiledScript, compile_script
+from jsonpath2path.common import jsonio
+from jsonpath2path.common.constants import ErrorPolicy
+
+
+@dataclass
+class BatchFailure:
+    """A document that failed to transform."""
+    # Position of the document in the input.
+    index: int
+    error: Exception
+    # Command raising the error.
+    command: str | None = None
+
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of a batch run.
+    """
+    # Transformed documents that succeeded, in input order.
+    outputs: list = field(default_factory=list)
+    failures: list[BatchFailure] = field(default_factory=list)
+    failed: int = 0
+    # Seconds spent on each document in input order, and on the whole batch.
+    timings: list[float] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    @property
+    def succeeded(self) -> int:
+        return len(self.outputs)
+
+    @property
+    def total(self) -> int:
+        return self.succeeded + self.failed
+
+
+def run_batch(commands: str | Iterable[str] | CompiledScript, documents: Iterable[dict | list | str],
+              on_error: ErrorPolicy = ErrorPolicy.COLLECT, **options) -> BatchResult:
+    """
+    Compile a command script once and apply it to every document.
+
+    Documents are transformed in place. A failed document is left as the failing command left it,
+    and does not stop the other documents unless `on_error` is `ErrorPolicy.RAISE`.
+
+    :param commands: Commands, one per line if given as a string, or a compiled script.
+    :param documents: JSON structures (or JSON strings) to transform.
+    :param on_error: How failed documents are handled, see `ErrorPolicy`. Collects by default, as outputs
+        are returned only at the end, unlike the streaming functions which raise by default.
+    :param options: Options of `compile()`.
+    :return: BatchResult with outputs, failures and timings.
+    """
+    script = compile_script(commands, **options)
+    result = BatchResult()
+
+    batch_start = time.perf_counter()
+    for index, document in enumerate(documents):
+        start = time.perf_counter()
+        command = None
+        try:
+            if isinstance(document, str):
+                document = jsonio.loads(document)
+            prefixes = script.prefix_cache(document)
+            for command in script:
+                command.apply(document, prefixes=prefixes)
+            result.outputs.append(document)
+        except Exception as e:
+            if on_error == ErrorPolicy.RAISE:
+                raise
+            result.failed += 1
+            if on_error == ErrorPolicy.COLLECT:
+                result.failures.append(BatchFailure(index, e, None if command is None else command.command))
+        finally:
+            result.timings.append(time.perf_counter() - start)
+    result.elapsed = time.perf_counter() - batch_start
+
+    return result
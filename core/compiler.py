@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+import json
+import time
+from copy import deepcopy
+from dataclasses import replace
+from typing import Callable, Iterable
+
+from jsonpath_ng import JSONPath
+from lark import Transformer as LarkTransformer
+from lark.exceptions import VisitError
+
+from .assigner import SlotAssigner
+from .converter import NodeConverter, ConverterData
+from .incremental import Footprint, plan, patch
+from .picker import NodePicker
+from .planner import ScriptPlan, PrefixCache
+from .transformer import CommandTransformer, get_command_parser
+from jsonpath2path import convert
+from jsonpath2path.common.constants import AssignType, PickType, CopyStrategy
+from jsonpath2path.common.copier import CopyStats
+from jsonpath2path.common.exceptions import ConvertFuncNotFoundError, InvalidJsonDataError
+from jsonpath2path.common.fastpath import SimplePath, FIELD, INDEX
+from jsonpath2path.common.metrics import CommandMetrics
+from jsonpath2path.convert.fusion import FusedConverters, fuse
+
+
+class CompiledCommand:
+    """
+    A JSONPathToPath command parsed once, with picker path, converter chain and assigner path ready to run.
+    """
+
+    def __init__(self, command: str,
+                 pick_type: PickType, pick_path: str | None, create_data: list | None,
+                 converters: list[tuple[str, Callable[[ConverterData, any], None], tuple]],
+                 assign_type: AssignType | None, assign_path: str | None,
+                 copy_strategy: CopyStrategy = CopyStrategy.ON_WRITE,
+                 copy_stats_hook: Callable[[CopyStats], None] | None = None, columnar: bool = False,
+                 metrics_hook: Callable[[CommandMetrics], None] | None = None):
+        self.command = command
+        self.copy_strategy = copy_strategy
+        self.columnar = columnar
+        self._copy_stats_hook = None
+        if copy_stats_hook is not None:
+            self._copy_stats_hook = lambda stats: copy_stats_hook(replace(stats, command=command))
+        self._metrics_hook = metrics_hook
+
+        self.pick_type = pick_type
+        self.pick_path = pick_path
+        self._pick_parser = None if pick_path is None else NodePicker.build_parser(pick_path)
+        self._create_edges, self._create_nodes = [], []
+        if pick_type == PickType.CREATE:
+            for [edge, node] in create_data:
+                self._create_edges.append(edge)
+                self._create_nodes.append(node)
+
+        # Converter chain of (name, function, params).
+        self.converters = converters
+        # Runs of per-field converters go in one pass, unless each is to run over columns on its own.
+        self._steps = [(convert_func, params) for _, convert_func, params in converters]
+        if not columnar:
+            self._steps = fuse(self._steps)
+        names = {convert_func: name for name, convert_func, _ in converters}
+        self._step_names = ["+".join(names[convert_func] for convert_func, _ in step.converters)
+                            if isinstance(step, FusedConverters) else names[step[0]] for step in self._steps]
+
+        self.assign_type = assign_type
+        self.assign_path = assign_path
+        self._slot = None if assign_path is None else SlotAssigner.build_parser(assign_path, assign_type)
+
+        # Step keys of the containers changed by plucking and assigning, see `PrefixCache.changed()`.
+        self._pluck_writes = None
+        if pick_type == PickType.PLUCK and isinstance(self._pick_parser, SimplePath):
+            self._pluck_writes = self._pick_parser.keys[:-1]
+        self._assign_writes = None
+        if self._slot is not None and isinstance(self._slot[0], SimplePath) and not self._slot[2]:
+            self._assign_writes = self._slot[0].keys
+        # Where the command reads and writes, for re-applying it to changed data, None unless its paths are simple.
+        self.footprint = self._footprint()
+
+    def _footprint(self) -> Footprint | None:
+        # Nodes landing by reference alias subtrees of the source.
+        if self.copy_strategy == CopyStrategy.REFERENCE:
+            return None
+        reads = removes = slots = edge = edges = None
+        if self._pick_parser is not None:
+            if not isinstance(self._pick_parser, SimplePath):
+                return None
+            reads = self._pick_parser.keys
+        if self.pick_type == PickType.PLUCK:
+            # Removing list elements moves those after them.
+            removes = reads if reads and reads[-1][0] == FIELD else reads[:-1]
+        if self._slot is not None:
+            if not isinstance(self._slot[0], SimplePath) or self._slot[2]:
+                return None
+            slots, edge = self._slot[0].keys, self._slot[1]
+
+        if self.pick_type == PickType.CREATE:
+            edges = list(self._create_edges)
+        elif (reads and reads[-1][0] == FIELD and all(kind in (FIELD, INDEX) for kind, _ in reads)
+              and all(convert.get_convert_trait(func, "field") is not None for _, func, _ in self.converters)):
+            # One field picked by name, per-field converters keep its edge.
+            edges = [reads[-1][1]]
+        return Footprint(reads, removes, slots, edge, edges)
+
+    def paths(self) -> list[JSONPath]:
+        """Parsers of the picker and assigner paths matched on the data."""
+        return [parser for parser in (self._pick_parser, self._slot and self._slot[0]) if parser is not None]
+
+    def apply(self, data: dict | list, to_data: dict | list = None, prefixes: PrefixCache = None) -> dict | list:
+        """
+        Apply the command, same as `CommandTransformer().source(data).by(command).to(data)`.
+        :param data: JSON structure, as the source data for transformation.
+        :param to_data: Target JSON structure, defaults to `data`.
+        :param prefixes: Shared path prefixes resolved by earlier commands of the script on data.
+        :return: The target JSON data.
+        """
+        if self._metrics_hook is None:
+            return self._apply(data, to_data, prefixes, None)
+
+        metrics = CommandMetrics(self.command)
+        try:
+            return self._apply(data, to_data, prefixes, metrics)
+        except Exception as e:
+            metrics.error = type(e).__name__
+            raise
+        finally:
+            self._metrics_hook(metrics)
+
+    def _apply(self, data: dict | list, to_data: dict | list | None, prefixes: PrefixCache | None,
+               metrics: CommandMetrics | None) -> dict | list:
+        if data is None:
+            raise InvalidJsonDataError("Source JSON data cannot be None")
+        if to_data is None:
+            to_data = data
+
+        pick_parser, slot = self._pick_parser, self._slot
+        if prefixes is not None:
+            pick_parser = pick_parser and prefixes.bind(pick_parser)
+            slot = slot and (prefixes.bind(slot[0]),) + slot[1:]
+
+        picker, assigner = NodePicker(), SlotAssigner()
+        converter = NodeConverter(self.copy_strategy, self._stats_hook(metrics), self.columnar)
+        started = time.perf_counter() if metrics is not None else 0.0
+        if self.pick_type == PickType.PLUCK:
+            try:
+                picker.pluck(data, pick_parser)
+            finally:
+                if prefixes is not None:
+                    prefixes.changed(self._pluck_writes)
+        elif self.pick_type == PickType.COPY:
+            picker.copy(data, pick_parser)
+        else:
+            picker.create(self._create_edges, self._create_nodes)
+        picker.to(converter)
+        if metrics is not None:
+            metrics.pick_seconds = time.perf_counter() - started
+            metrics.matches = len(converter.nodes)
+        self._convert(converter, metrics)
+
+        # Pluck only, nothing to assign.
+        if self.assign_path is None:
+            return to_data
+
+        started = time.perf_counter() if metrics is not None else 0.0
+        converter.to(assigner)
+        assigner.assign(self.assign_path, self.assign_type, slot)
+        try:
+            return assigner.to(to_data)
+        finally:
+            if prefixes is not None:
+                prefixes.changed(self._assign_writes if to_data is data else None)
+            if metrics is not None:
+                metrics.assign_seconds = time.perf_counter() - started
+                metrics.slots = assigner.written
+
+    def _convert(self, converter: NodeConverter, metrics: CommandMetrics | None) -> None:
+        for name, step in zip(self._step_names, self._steps):
+            started = time.perf_counter() if metrics is not None else 0.0
+            if isinstance(step, FusedConverters):
+                converter.apply_fused(step)
+            else:
+                converter.apply(step[0], *step[1])
+            if metrics is not None:
+                metrics.converted(name, started)
+
+    def edges(self, data: dict | list) -> list[str | int]:
+        """
+        Edges of the nodes the command would assign, picked from data by copy and converted, nothing is assigned.
+        :param data: JSON structure, left unchanged.
+        """
+        picker, converter = NodePicker(), NodeConverter(self.copy_strategy, None, self.columnar)
+        if self.pick_type == PickType.CREATE:
+            picker.create(self._create_edges, self._create_nodes)
+        else:
+            picker.copy(data, self._pick_parser)
+        picker.to(converter)
+        self._convert(converter, None)
+        return list(converter.edges)
+
+    def _stats_hook(self, metrics: CommandMetrics | None) -> Callable[[CopyStats], None] | None:
+        """Copy statistics hook of an application, also filling metrics."""
+        if metrics is None:
+            return self._copy_stats_hook
+
+        def stats_hook(stats: CopyStats) -> None:
+            metrics.objects_copied, metrics.bytes_copied = stats.objects_copied, stats.bytes_copied
+            if self._copy_stats_hook is not None:
+                self._copy_stats_hook(stats)
+
+        return stats_hook
+
+    def __str__(self):
+        return f"CompiledCommand({self.command})"
+
+
+class CompiledScript:
+    """
+    An ordered sequence of compiled commands, applied one after another to the same JSON data.
+    """
+
+    def __init__(self, commands: list[CompiledCommand]):
+        self.commands = commands
+        # Shared path prefixes. Nodes landing by reference alias subtrees, so their writes cannot be tracked by path.
+        self._plan = None
+        if all(command.copy_strategy != CopyStrategy.REFERENCE for command in commands):
+            self._plan = ScriptPlan([path for command in commands for path in command.paths()]) or None
+
+    def prefix_cache(self, data: dict | list) -> PrefixCache | None:
+        """Cache of shared path prefixes for applying the commands to data, None if nothing is shared."""
+        return None if self._plan is None else PrefixCache(self._plan, data)
+
+    def apply(self, data: dict | list, to_data: dict | list = None) -> dict | list:
+        """
+        Apply every command in order.
+        :param data: JSON structure, as the source data for transformation.
+        :param to_data: Target JSON structure, defaults to `data`.
+        :return: The target JSON data.
+        """
+        if to_data is None:
+            to_data = data
+        prefixes = self.prefix_cache(data)
+        for command in self.commands:
+            command.apply(data, to_data, prefixes)
+        return to_data
+
+    def apply_incremental(self, data: dict | list, changes: list, previous_data: dict | list,
+                          previous_output: dict | list) -> dict | list:
+        """
+        Apply every command in order to data, a changed version of previous_data, by updating the output of
+        `apply(previous_data)` rather than transforming data from scratch.
+
+        Only commands whose picker or slot paths may meet the changes are applied again, on data or the output,
+        and changed locations no command reads or writes are copied over. Where that cannot be told from the paths,
+        e.g. a command plucks changed nodes or a path is not a `SimplePath`, the output is computed from scratch.
+        Only scripts applied in place, as by `apply(data)`, are supported.
+
+        :param data: JSON structure, the new source data, left unchanged.
+        :param changes: How previous_data changed into data, as JSON Patch (RFC 6902) operations,
+            or changed locations as JSONPaths of fields and indices, e.g. `$.items[3].price`, or JSON Pointers.
+        :param previous_data: JSON structure, the source data of previous_output, left unchanged.
+        :param previous_output: Output of `apply()` on previous_data, updated in place.
+        :return: The output on data, previous_output unless the type of the root changed.
+        """
+        if data is None or previous_data is None or previous_output is None:
+            raise InvalidJsonDataError("Source, previous source and previous output JSON data cannot be None")
+        steps = plan([command.footprint for command in self.commands], self._edges, previous_data, data, changes)
+        if steps is not None and all(patch(previous_output, path, data) for path in steps.patches):
+            prefixes = self.prefix_cache(previous_output)
+            for index, from_output in steps.replays:
+                self.commands[index].apply(previous_output if from_output else data, previous_output, prefixes)
+            return previous_output
+
+        output = self.apply(deepcopy(data))
+        if isinstance(output, dict) and isinstance(previous_output, dict):
+            previous_output.clear()
+            previous_output.update(output)
+        elif isinstance(output, list) and isinstance(previous_output, list):
+            previous_output[:] = output
+        else:
+            return output
+        return previous_output
+
+    def _edges(self, index: int, data: dict | list) -> list[str | int] | None:
+        try:
+            return self.commands[index].edges(data)
+        except Exception:
+            # Applying the command fails the same way.
+            return None
+
+    def __iter__(self):
+        return iter(self.commands)
+
+    def __len__(self):
+        return len(self.commands)
+
+    def __str__(self):
+        return f"CompiledScript({[command.command for command in self.commands]})"
+
+
+class CommandCompiler(LarkTransformer):
+    """
+    Turn the parse tree of a JSONPathToPath command into a `CompiledCommand`.
+    """
+
+    def __init__(self, command: str, **options):
+        super().__init__()
+        self._command = command
+        # Options passed to `CompiledCommand`.
+        self._options = options
+
+    def start(self, items):
+        return items[0]
+
+    def command(self, items):
+        (pick_type, pick_path, create_data), converters, assigner = items
+        assign_type, assign_path = assigner if assigner is not None else (None, None)
+        return CompiledCommand(self._command, pick_type, pick_path, create_data,
+                               converters, assign_type, assign_path, **self._options)
+
+    @staticmethod
+    def t_picker(items):
+        picker = items[0].type
+        if picker == "PICKER_CREATE":
+            return PickType.CREATE, None, json.loads(str(items[0]).strip('`'))
+        if picker == "PICKER_PLUCK":
+            return PickType.PLUCK, str(items[0]), None
+        if picker == "PICKER_COPY":
+            return PickType.COPY, str(items[0]).strip('@'), None
+        raise ValueError("Unknown picker type")
+
+    @staticmethod
+    def t_converter(items):
+        return list(items)
+
+    @staticmethod
+    def t_convert_cmd(items):
+        convert_name = str(items[0])
+        convert_func = convert.get_convert_func(convert_name)
+        if convert_func is None:
+            raise ConvertFuncNotFoundError(f"Invalid convert function {convert_name}")
+        # Arguments are compiled once, e.g. lambda strings, and reused by every application.
+        params = tuple(items[1:])
+        prepare = convert.get_convert_trait(convert_func, "prepare")
+        return convert_name, convert_func, params if prepare is None else prepare(*params)
+
+    t_param = staticmethod(CommandTransformer.t_param)
+
+    @staticmethod
+    def t_assigner(items):
+        if len(items) != 2:
+            return None
+        if items[0].type == "ASSIGN_MOUNT":
+            return AssignType.MOUNT, items[1].value
+        if items[0].type == "ASSIGN_OCCUPY":
+            return AssignType.OCCUPY, items[1].value
+        raise ValueError("Unknown assign type")
+
+
+def compile(command: str, copy_strategy: CopyStrategy = CopyStrategy.ON_WRITE,
+            copy_stats_hook: Callable[[CopyStats], None] | None = None, columnar: bool = False,
+            metrics_hook: Callable[[CommandMetrics], None] | None = None) -> CompiledCommand:
+    """
+    Parse a JSONPathToPath command once, so that it can be applied to many JSON data.
+
+    :param command: JSONPathToPath command.
+    :param copy_strategy: How picked nodes are copied, see `CopyStrategy`.
+    :param copy_stats_hook: Callback receiving the `CopyStats` of each application.
+    :param columnar: Run convert functions over whole columns of the picked nodes where they support it,
+        e.g. `v_number_round` on the field of every picked record at once.
+    :param metrics_hook: Callback receiving the `CommandMetrics` of each application, e.g. a `Metrics`.
+        Off by default, timing and copy measuring cost nothing then.
+    :return: CompiledCommand, use `apply(data)` to execute it.
+    """
+    tree = get_command_parser().parse(command)
+    try:
+        return CommandCompiler(command, copy_strategy=copy_strategy, copy_stats_hook=copy_stats_hook,
+                               columnar=columnar, metrics_hook=metrics_hook).transform(tree)
+    except VisitError as e:
+        raise e.orig_exc
+
+
+def compile_script(script: str | Iterable[str] | CompiledScript, **options) -> CompiledScript:
+    """
+    Compile a sequence of JSONPathToPath commands, one per line if given as a string.
+    Blank lines and lines starting with `#` are ignored.
+
+    :param script: Commands, a compiled script is returned as is.
+    :param options: Options of `compile()`.
+    :return: CompiledScript, use `apply(data)` to execute it.
+    """
+    if isinstance(script, CompiledScript):
+        return script
+    if isinstance(script, str):
+        script = script.splitlines()
+    commands = [command.strip() for command in script]
+    return CompiledScript([compile(command, **options) for command in commands
+                           if command and not command.startswith('#')])
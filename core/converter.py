@@ -5,18 +5,35 @@ from typing import Callable
 from jsonpath_ng import DatumInContext
 
 from .assigner import SlotAssigner
+from jsonpath2path.common.constants import CopyStrategy, Mutation, PickType
+from jsonpath2path.common.copier import NodeCopier, CopyStats
 from jsonpath2path.common.exceptions import *
-from jsonpath2path.common.utils import get_edge, get_node
+from jsonpath2path.common.utils import PathMatch, get_edge, get_node
 from jsonpath2path import convert
+from jsonpath2path.convert.columnar import run_columnar, field_kernel
+from jsonpath2path.convert.fusion import FusedConverters
 from jsonpath2path.common.entities import ConverterData, JsonPathMatchIndex
 
 
 class NodeConverter(ConverterData):
-    def __init__(self):
+    def __init__(self, copy_strategy: CopyStrategy = CopyStrategy.ON_WRITE,
+                 copy_stats_hook: Callable[[CopyStats], None] | None = None, columnar: bool = False):
         super().__init__()
         self._user_defined_convert_map: dict[str, Callable[[ConverterData, any], None]] = {}
 
-    def source(self, matches: list[DatumInContext]) -> NodeConverter:
+        # How picked nodes are copied, and the callback receiving copy statistics of each command.
+        self.copy_strategy = copy_strategy
+        self.copy_stats_hook = copy_stats_hook
+        self._copier = None
+        self._pick_type = None
+        # Run convert functions having a columnar form over whole columns, see `run_columnar()`.
+        self.columnar = columnar
+
+    def source(self, matches: list[DatumInContext | PathMatch], pick_type: PickType = PickType.COPY) -> NodeConverter:
+        """
+        :param matches: Picked matches, `PathMatch` for simple paths and created nodes.
+        :param pick_type: How matches were picked, plucked nodes are no longer shared with the source data.
+        """
         if matches is None or len(matches) == 0:
             raise InvalidMatchError("No matches to convert")
 
@@ -24,30 +41,73 @@ class NodeConverter(ConverterData):
         self._match_index = JsonPathMatchIndex(matches)
 
         self.edges = [get_edge(match) for match in matches]
-        self.nodes = [get_node(match) for match in matches]
+        self._pick_type = pick_type
+        if self.copy_strategy == CopyStrategy.DEEP:
+            self.nodes = [get_node(match) for match in matches]
+            self._copier = NodeCopier(False, self.copy_stats_hook)
+            self._copier.copied(self.nodes)
+        else:
+            self.nodes = [match.value for match in matches]
+            self._copier = NodeCopier(pick_type != PickType.PLUCK, self.copy_stats_hook)
+            self._copier.baseline(self.nodes)
         return self
 
     def to(self, assigner: SlotAssigner) -> SlotAssigner:
         if assigner is None:
             raise InvalidAssigner("Assigner CANNOT be None")
+        if self._copier is not None:
+            # Created nodes are shared with their template and always land as copies.
+            keep_shared = self.copy_strategy == CopyStrategy.REFERENCE and self._pick_type == PickType.COPY
+            self._copier.release(self.nodes, keep_shared)
         assigner.source(self.edges, self.nodes)
         return assigner
 
     def convert(self, convert_name: str, *args, **kwargs) -> NodeConverter:
-        convert_func = self._user_defined_convert_map.get(convert_name)
-        if convert_func is not None:
-            convert_func(self, *args, **kwargs)
-            return self
+        convert_func = self.resolve(convert_name)
+        if convert_func is None:
+            raise AttributeError(f"Invalid convert function {convert_name}")
+        return self.apply(convert_func, *args, **kwargs)
 
-        convert_func = convert.get_convert_func(convert_name)
-        if convert_func is not None:
-            convert_func(self, *args, **kwargs)
+    def apply(self, convert_func: Callable[[ConverterData, any], None], *args, **kwargs) -> NodeConverter:
+        """Run an already resolved convert function on the picked nodes."""
+        if self._copier is not None:
+            # Copy shared containers the convert function is about to change.
+            mutates = convert.get_convert_trait(convert_func, "mutates")
+            if callable(mutates):
+                mutates = mutates(*args)
+            if mutates == Mutation.FIELDS:
+                self._copier.prepare_fields(self.nodes, list(args[:1]))
+            elif mutates == Mutation.NODES:
+                self._copier.prepare_nodes(self.nodes)
+
+        kernel = None
+        if self.columnar:
+            kernel = convert.get_convert_trait(convert_func, "columnar")
+            field = convert.get_convert_trait(convert_func, "field")
+            if kernel is None and field is not None:
+                kernel = field_kernel(field)
+        if kernel is not None and len(args) > 0 and run_columnar(kernel, self.nodes, *args, **kwargs):
             return self
+        convert_func(self, *args, **kwargs)
+        return self
+
+    def apply_fused(self, fused: FusedConverters) -> NodeConverter:
+        """Run consecutive per-field convert functions in one pass, see `FusedConverters`."""
+        if self._copier is not None:
+            self._copier.prepare_fields(self.nodes, fused.jsonpaths)
+        if not fused.run(self.nodes):
+            for convert_func, params in fused.converters:
+                self.apply(convert_func, *params)
+        return self
 
-        raise AttributeError(f"Invalid convert function {convert_name}")
+    def resolve(self, convert_name: str) -> Callable[[ConverterData, any], None] | None:
+        convert_func = self._user_defined_convert_map.get(convert_name)
+        if convert_func is not None:
+            return convert_func
+        return convert.get_convert_func(convert_name)
 
     def register(self, func_name: str, convert_func: Callable[[ConverterData, any], None]) -> None:
-        if func_name in self._user_defined_convert_map or func_name in self._internal_convert_map:
+        if func_name in self._user_defined_convert_map or convert.get_convert_func(func_name) is not None:
             raise AttributeError(f"convert function {func_name} already existed")
         self._user_defined_convert_map[func_name] = convert_func
 
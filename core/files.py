@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import io
+import os
+import sys
+import time
+from typing import BinaryIO, Iterable, TextIO
+
+from .batch import BatchFailure
+from .compiler import CompiledScript, compile_script
+from .streaming import StreamResult, iter_json_array, iter_jsonl, transform_records
+from jsonpath2path.common import jsonio
+from jsonpath2path.common.constants import ErrorPolicy, FileFormat
+
+# Size of the output buffer, encoded records are written in bulk once it is full.
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+# Path standing for stdin / stdout.
+STDIO_PATH = "-"
+
+_JSONL_SUFFIXES = (".jsonl", ".ndjson")
+
+
+def guess_format(path: str | os.PathLike) -> FileFormat:
+    """JSON Lines for `.jsonl` / `.ndjson` files, a single JSON document otherwise."""
+    return FileFormat.JSONL if os.fspath(path).lower().endswith(_JSONL_SUFFIXES) else FileFormat.JSON
+
+
+def _binary(stream: BinaryIO | TextIO) -> BinaryIO:
+    # Text streams such as sys.stdin are read and written through their binary buffer, skipping text decoding.
+    if isinstance(stream, io.TextIOBase) and hasattr(stream, "buffer"):
+        if stream.writable():
+            stream.flush()
+        return stream.buffer
+    return stream
+
+
+class _BufferedWriter:
+    """Collect encoded records and write them in bulk."""
+
+    def __init__(self, stream: BinaryIO | TextIO, buffer_size: int):
+        stream = _binary(stream)
+        self._stream = stream
+        self._text = isinstance(stream, io.TextIOBase)
+        self._buffer_size = buffer_size
+        self._chunks: list[bytes] = []
+        self._size = 0
+
+    def write(self, data: bytes) -> None:
+        self._chunks.append(data)
+        self._size += len(data)
+        if self._size >= self._buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._chunks:
+            data = b"".join(self._chunks)
+            self._stream.write(data.decode("utf-8") if self._text else data)
+            self._chunks.clear()
+            self._size = 0
+        self._stream.flush()
+
+
+def transform_stream(commands: str | Iterable[str] | CompiledScript, source: BinaryIO | TextIO,
+                     target: BinaryIO | TextIO, file_format: FileFormat = FileFormat.JSON,
+                     on_error: ErrorPolicy = ErrorPolicy.RAISE, buffer_size: int = DEFAULT_BUFFER_SIZE,
+                     **options) -> StreamResult:
+    """
+    Transform JSON read from a binary (or text) stream and write the result to another stream.
+
+    Documents are decoded and encoded by the JSON backend of `jsonio` (orjson / ujson if installed),
+    output is written in bulk through a buffer of buffer_size bytes.
+
+    :param commands: Commands, one per line if given as a string, or a compiled script.
+    :param source: Stream to read, binary streams are fastest.
+    :param target: Stream to write.
+    :param file_format: `JSON` for one document, `JSONL` for one document per line,
+        `JSON_ARRAY` for a top-level array transformed element by element.
+    :param on_error: How failed records are handled, failed records are not written. Raises by default,
+        unlike `run_batch()` which collects, as records before a failure are already written.
+    :param buffer_size: Output buffer size in bytes.
+    :param options: Options of `compile()`.
+    :return: StreamResult.
+    """
+    script = compile_script(commands, **options)
+    source = _binary(source)
+    writer = _BufferedWriter(target, buffer_size)
+    result = StreamResult()
+
+    if file_format == FileFormat.JSON:
+        start = time.perf_counter()
+        try:
+            document = script.apply(jsonio.loads(source.read()))
+        except Exception as e:
+            if on_error == ErrorPolicy.RAISE:
+                raise
+            result.failed += 1
+            if on_error == ErrorPolicy.COLLECT:
+                result.failures.append(BatchFailure(0, e))
+        else:
+            result.succeeded += 1
+            writer.write(jsonio.dumps_bytes(document))
+            writer.write(b"\n")
+        result.elapsed = time.perf_counter() - start
+    elif file_format == FileFormat.JSONL:
+        for record in transform_records(script, iter_jsonl(source), on_error, result, decode=True):
+            writer.write(jsonio.dumps_bytes(record))
+            writer.write(b"\n")
+    elif file_format == FileFormat.JSON_ARRAY:
+        wrapped = not isinstance(source, io.TextIOBase)
+        text = io.TextIOWrapper(source, encoding="utf-8") if wrapped else source
+        try:
+            writer.write(b"[")
+            for i, record in enumerate(transform_records(script, iter_json_array(text), on_error, result)):
+                if i > 0:
+                    writer.write(b",")
+                writer.write(jsonio.dumps_bytes(record))
+            writer.write(b"]\n")
+        finally:
+            # Leave the source open for the caller.
+            if wrapped:
+                text.detach()
+    else:
+        raise ValueError(f"Unknown file format: {file_format}")
+
+    writer.flush()
+    return result
+
+
+def transform_file(commands: str | Iterable[str] | CompiledScript, source: str | os.PathLike,
+                   target: str | os.PathLike = STDIO_PATH, file_format: FileFormat = None,
+                   **options) -> StreamResult:
+    """
+    Transform a JSON file and write the result to another file, `-` stands for stdin / stdout.
+    The target must not be the source, ValueError is raised, except for `FileFormat.JSON` which reads the whole source first.
+
+    :param commands: Commands, one per line if given as a string, or a compiled script.
+    :param source: Path to read.
+    :param target: Path to write.
+    :param file_format: See `transform_stream()`, guessed from the source suffix by default.
+    :param options: Options of `transform_stream()` and `compile()`.
+    :return: StreamResult.
+    """
+    if file_format is None:
+        file_format = guess_format(source if os.fspath(source) != STDIO_PATH else target)
+
+    from_stdin = os.fspath(source) == STDIO_PATH
+    if file_format != FileFormat.JSON and not from_stdin and os.fspath(target) != STDIO_PATH \
+            and os.path.exists(target) and os.path.samefile(source, target):
+        # Opening the target would truncate the source before it is read.
+        raise ValueError(f"Target {target} is the source, only allowed for {FileFormat.JSON.name}")
+    source_stream = sys.stdin.buffer if from_stdin else open(source, "rb")
+    try:
+        if file_format == FileFormat.JSON and not from_stdin:
+            # The whole document is read anyway, so the target may be the source.
+            data = source_stream.read()
+            source_stream.close()
+            source_stream = io.BytesIO(data)
+        if os.fspath(target) == STDIO_PATH:
+            return transform_stream(commands, source_stream, sys.stdout, file_format, **options)
+        with open(target, "wb") as target_stream:
+            return transform_stream(commands, source_stream, target_stream, file_format, **options)
+    finally:
+        if not from_stdin:
+            source_stream.close()
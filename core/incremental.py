@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import Callable
+
+from jsonpath2path.common.exceptions import InvalidParamError
+from jsonpath2path.common.fastpath import SimplePath, FIELD, ALL_FIELDS, INDEX, ALL_INDICES, FILTER, parse_path
+from .planner import may_match_same
+
+_PATCH_OPS = {"add", "remove", "replace", "move", "copy", "test"}
+
+_MISSING = object()
+
+
+@dataclass
+class Footprint:
+    """
+    Where a command reads and writes the data, as step keys of simple paths, see `SimplePath.keys`.
+    """
+    # Picked nodes, None for created nodes.
+    reads: tuple | None
+    # Containers plucked nodes are removed from, None unless plucking.
+    removes: tuple | None
+    # Slots, the containers nodes are assigned to, None without assigner.
+    slots: tuple | None
+    # Edge of every node in Occupy mode, None in Mount mode.
+    edge: str | None
+    # Edges of the nodes known without picking, e.g. of created nodes or of one field picked by name.
+    edges: list | None
+
+
+@dataclass
+class IncrementalPlan:
+    """How to turn the output of a script on previous data into its output on changed data."""
+    # Changed locations no command reads or writes, copied from the data as is.
+    patches: list[tuple] = field(default_factory=list)
+    # Indices of the commands to re-apply in order, with whether they read the output, sharing path prefixes
+    # with their slots, instead of the data.
+    replays: list[tuple[int, bool]] = field(default_factory=list)
+
+
+def _overlap(a: tuple, b: tuple) -> bool:
+    """
+    Whether a location matched by a may be on the way to, at or below a location matched by b, or the reverse.
+    Locations inside an element a filter step matches overlap, as the filter may read them.
+    """
+    for x, y in zip(a, b):
+        if not may_match_same(x, y):
+            return False
+        if x[0] == FILTER or y[0] == FILTER:
+            return True
+    return True
+
+
+def _covers(region: tuple, path: tuple) -> bool:
+    """Whether writing the locations matched by region surely replaces path, a concrete location."""
+    if len(region) > len(path):
+        return False
+    for (kind, arg), step in zip(region, path):
+        if (kind, arg) != step and not (kind == ALL_FIELDS and step[0] == FIELD) \
+                and not (kind == ALL_INDICES and step[0] == INDEX):
+            return False
+    return True
+
+
+def _change_tokens(changes: list) -> list[list[str | int]] | None:
+    """Steps of each changed location, None if one is not a path of fields and indices."""
+    paths = []
+    for change in changes:
+        if isinstance(change, dict):
+            op = change.get("op")
+            if op not in _PATCH_OPS or "path" not in change or (op == "move" and "from" not in change):
+                raise InvalidParamError(f"Invalid JSON Patch operation {change}")
+            if op == "test":
+                continue
+            paths.append(change["path"])
+            if op == "move":
+                paths.append(change["from"])
+        else:
+            paths.append(change)
+
+    tokens = []
+    for path in paths:
+        if not isinstance(path, str):
+            raise InvalidParamError(f"Changed path must be a JSONPath or a JSON Pointer, not {path!r}")
+        if path.startswith("$"):
+            parser = parse_path(path)
+            if not isinstance(parser, SimplePath) or any(kind not in (FIELD, INDEX) for kind, _ in parser.steps):
+                return None
+            tokens.append([arg for _, arg in parser.steps])
+        elif path == "" or path.startswith("/"):
+            tokens.append([token.replace("~1", "/").replace("~0", "~") for token in path.split("/")[1:]])
+        else:
+            raise InvalidParamError(f"Invalid JSON Pointer {path}")
+    return tokens
+
+
+def _locate(tokens: list[str | int], previous_data: any, data: any) -> tuple:
+    """
+    Step keys of a changed location, widened to the container where previous_data and data differ in shape,
+    e.g. to a list whose length changed, as indices in it no longer refer to the same elements.
+    """
+    keys, old, new = [], previous_data, data
+    for token in tokens:
+        if isinstance(old, dict) and isinstance(new, dict):
+            if not isinstance(token, str):
+                break
+            keys.append((FIELD, token))
+            old, new = old.get(token, _MISSING), new.get(token, _MISSING)
+        elif isinstance(old, list) and isinstance(new, list):
+            if isinstance(token, str):
+                if not token.isdigit():
+                    break
+                token = int(token)
+            if len(old) != len(new) or not 0 <= token < len(old):
+                break
+            keys.append((INDEX, token))
+            old, new = old[token], new[token]
+        else:
+            break
+    return tuple(keys)
+
+
+def changed_paths(changes: list, previous_data: any, data: any) -> list[tuple] | None:
+    """
+    Step keys of the changed locations, outermost only.
+    :param changes: JSON Patch operations, or changed paths as JSONPaths or JSON Pointers.
+    :return: Locations, None if they cannot be told from changes.
+    """
+    tokens = _change_tokens(changes)
+    if tokens is None:
+        return None
+    paths = []
+    for path in sorted({_locate(steps, previous_data, data) for steps in tokens}, key=len):
+        if not any(path[:len(outer)] == outer for outer in paths):
+            paths.append(path)
+    return paths
+
+
+def plan(footprints: list[Footprint | None], edges: Callable[[int, any], list | None],
+         previous_data: any, data: any, changes: list) -> IncrementalPlan | None:
+    """
+    Plan the re-application of a script after its source data changed from previous_data to data.
+
+    A command is re-applied when it may read a changed location or the slots of a re-applied command,
+    or write into a changed container or over a re-applied command. Changed locations no command reads
+    or writes are copied over, those a later command overwrites are left.
+
+    :param footprints: Footprint of each command, None where its paths are not simple.
+    :param edges: Edges of the nodes a command assigns when applied to the given data, None if it fails.
+    :return: IncrementalPlan, None where the output has to be computed from scratch.
+    """
+    if None in footprints:
+        return None
+    alive = changed_paths(changes, previous_data, data)
+    if alive is None or () in alive:
+        return None
+
+    writes: dict[int, list[tuple[tuple, bool]]] = {}
+    new_edges: dict[int, list | None] = {}
+
+    def reads_data(i: int) -> bool:
+        """Whether the command reads what data holds, no earlier command writing there."""
+        reads = footprints[i].reads
+        return reads is None or not any(_overlap(region, reads) for j in range(i) for region, _ in regions(j))
+
+    def regions(i: int) -> list[tuple[tuple, bool]]:
+        """Locations the command writes, with whether each is surely replaced as a whole."""
+        if i in writes:
+            return writes[i]
+        footprint, result = footprints[i], []
+        if footprint.removes is not None:
+            result.append((footprint.removes, False))
+        if footprint.slots is not None:
+            if footprint.edge is not None:
+                result.append((footprint.slots + ((FIELD, footprint.edge),), True))
+            else:
+                node_edges = footprint.edges
+                if node_edges is None and reads_data(i):
+                    node_edges = new_edges[i] = edges(i, data)
+                if node_edges is not None and all(isinstance(edge, str) for edge in node_edges):
+                    result.extend((footprint.slots + ((FIELD, edge),), True) for edge in dict.fromkeys(node_edges))
+                else:
+                    # Mounted in lists, or by edges unknown.
+                    result.append((footprint.slots, False))
+        writes[i] = result
+        return result
+
+    result, dirty = IncrementalPlan(), []
+    for i, footprint in enumerate(footprints):
+        own = regions(i)
+        hit = footprint.reads is not None and any(_overlap(footprint.reads, path) for path in alive + dirty)
+        hit = hit or any(_overlap(region, path) for region, _ in own for path in dirty)
+        for path in list(alive):
+            for region, exact in own:
+                if not _overlap(region, path):
+                    continue
+                if len(region) > len(path):
+                    # Writes into a changed container, again after it is copied over.
+                    hit = True
+                elif exact and _covers(region, path):
+                    alive.remove(path)
+                    break
+                else:
+                    return None
+        if not hit:
+            continue
+
+        # Plucked nodes move, and filtered slots may no longer match: where they were is unknown.
+        if footprint.removes is not None or any(kind == FILTER for kind, _ in footprint.slots or ()):
+            return None
+        # The output holds what it reads unless it or a later command writes there, e.g. what an earlier command wrote.
+        from_output = footprint.reads is None or not any(_overlap(region, footprint.reads)
+                                                         for k in range(i, len(footprints)) for region, _ in regions(k))
+        if not from_output and not reads_data(i):
+            return None
+        # A later command writing above its slots replaced them, they may not exist in the output.
+        if any(_overlap(later, region) and len(later) < len(region)
+               for k in range(i + 1, len(footprints)) for later, _ in regions(k) for region, _ in own):
+            return None
+        if footprint.slots is not None and footprint.edge is None and footprint.edges is None:
+            # Mounted nodes replace those mounted before only by the same edges.
+            if new_edges.get(i) is None or new_edges[i] != edges(i, previous_data) \
+                    or not all(isinstance(edge, str) for edge in new_edges[i]):
+                return None
+        dirty.extend(region for region, _ in own)
+        result.replays.append((i, from_output))
+
+    result.patches = alive
+    return result
+
+
+def patch(output: dict | list, path: tuple, data: any) -> bool:
+    """Copy the location path of data into output, or remove it where data has none. False if output has no parent."""
+    parent, source = output, data
+    for _, key in path[:-1]:
+        try:
+            parent, source = parent[key], source[key]
+        except (KeyError, IndexError, TypeError):
+            return False
+    key = path[-1][1]
+    if isinstance(parent, dict) and isinstance(source, dict):
+        if key in source:
+            parent[key] = deepcopy(source[key])
+        else:
+            parent.pop(key, None)
+        return True
+    if isinstance(parent, list) and isinstance(source, list) and len(parent) == len(source) and key < len(source):
+        parent[key] = deepcopy(source[key])
+        return True
+    return False
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import importlib
+import itertools
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator
+
+from .batch import BatchResult, run_batch
+from .compiler import CompiledScript, compile_script
+from jsonpath2path.common.constants import ErrorPolicy, CopyStrategy
+from jsonpath2path.convert.register import USER_DEFINED_CONVERT_MAP
+
+# Compiled script of the current worker process, set once by `_init_worker`.
+_worker_script: CompiledScript | None = None
+
+
+def _init_worker(commands: list[str], copy_strategy: CopyStrategy, columnar: bool, user_converts: dict,
+                 imports: list[str]):
+    global _worker_script
+    for module in imports:
+        importlib.import_module(module)
+    for name, convert_func in user_converts.items():
+        USER_DEFINED_CONVERT_MAP.setdefault(name, convert_func)
+    _worker_script = compile_script(commands, copy_strategy=copy_strategy, columnar=columnar)
+
+
+def _run_chunk(offset: int, documents: list, on_error: ErrorPolicy) -> BatchResult:
+    result = run_batch(_worker_script, documents, on_error)
+    for failure in result.failures:
+        failure.index += offset
+    return result
+
+
+class ParallelExecutor:
+    """
+    Apply a command script to documents in worker processes.
+
+    The script is shipped to each worker once and compiled there, documents are sent in chunks with a bounded
+    number of chunks in flight. User-defined convert functions registered by `register_user_defined_convert`
+    are shipped to the workers by reference, so they must be importable (defined at module level);
+    modules in `imports` are imported in each worker first, e.g. to register convert functions.
+    """
+
+    def __init__(self, commands: str | Iterable[str], workers: int = None, chunk_size: int = 1000,
+                 max_in_flight: int = None, ordered: bool = True, on_error: ErrorPolicy = ErrorPolicy.COLLECT,
+                 copy_strategy: CopyStrategy = CopyStrategy.ON_WRITE, imports: Iterable[str] = (),
+                 mp_context=None, columnar: bool = False):
+        """
+        :param commands: Commands, one per line if given as a string.
+        :param workers: Number of worker processes, defaults to the CPU count.
+        :param chunk_size: Number of documents sent to a worker at once.
+        :param max_in_flight: Maximum number of chunks submitted but not yet returned, defaults to 2 * workers.
+        :param ordered: Return chunks in input order, otherwise as they complete.
+        :param on_error: How failed documents are handled, see `ErrorPolicy`. Collects by default,
+            like `run_batch()`.
+        :param copy_strategy: See `CopyStrategy`.
+        :param imports: Modules imported in each worker before compiling the script.
+        :param mp_context: multiprocessing context of the pool.
+        :param columnar: Run convert functions over whole columns, see `compile()`.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        if isinstance(commands, str):
+            commands = commands.splitlines()
+        self._commands = list(commands)
+        # Fail fast on invalid commands before starting workers.
+        compile_script(self._commands, copy_strategy=copy_strategy, columnar=columnar)
+
+        self._workers = workers or os.cpu_count() or 1
+        self._chunk_size = chunk_size
+        self._max_in_flight = max_in_flight or 2 * self._workers
+        self._ordered = ordered
+        self._on_error = on_error
+        self._initargs = (self._commands, copy_strategy, columnar, dict(USER_DEFINED_CONVERT_MAP), list(imports))
+        self._mp_context = mp_context
+        self._pool: ProcessPoolExecutor | None = None
+
+    def imap(self, documents: Iterable[dict | list | str]) -> Iterator[BatchResult]:
+        """
+        Transform documents lazily, yielding one `BatchResult` per chunk.
+        Failure indices refer to positions in `documents`.
+        """
+        pool = self._get_pool()
+        chunks = enumerate(self._chunks(documents))
+        in_flight: dict[Future, int] = {}
+        done: dict[int, BatchResult] = {}
+        next_seq, exhausted = 0, False
+
+        while True:
+            # Completed chunks waiting for their turn also count as in flight, keeping memory bounded.
+            while not exhausted and len(in_flight) + len(done) < self._max_in_flight:
+                item = next(chunks, None)
+                if item is None:
+                    exhausted = True
+                    break
+                seq, (offset, chunk) = item
+                in_flight[pool.submit(_run_chunk, offset, chunk, self._on_error)] = seq
+            if not in_flight and not done:
+                return
+
+            # Wait for at least one chunk unless the next chunk in order is already done.
+            if in_flight and (not self._ordered or next_seq not in done):
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done[in_flight.pop(future)] = future.result()
+
+            if self._ordered:
+                while next_seq in done:
+                    yield done.pop(next_seq)
+                    next_seq += 1
+            else:
+                for seq in list(done):
+                    yield done.pop(seq)
+
+    def run(self, documents: Iterable[dict | list | str]) -> BatchResult:
+        """
+        Transform all documents and merge the chunk results.
+        Outputs are in input order if `ordered`, otherwise in completion order.
+        """
+        result = BatchResult()
+        start = time.perf_counter()
+        for chunk in self.imap(documents):
+            result.outputs.extend(chunk.outputs)
+            result.failures.extend(chunk.failures)
+            result.failed += chunk.failed
+            result.timings.extend(chunk.timings)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self._workers, mp_context=self._mp_context,
+                                             initializer=_init_worker, initargs=self._initargs)
+        return self._pool
+
+    def _chunks(self, documents: Iterable) -> Iterator[tuple[int, list]]:
+        documents = iter(documents)
+        for offset in itertools.count(0, self._chunk_size):
+            chunk = list(itertools.islice(documents, self._chunk_size))
+            if not chunk:
+                return
+            yield offset, chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def run_parallel(commands: str | Iterable[str], documents: Iterable[dict | list | str], **options) -> BatchResult:
+    """
+    Apply a command script to documents in worker processes, see `ParallelExecutor` for options.
+    """
+    with ParallelExecutor(commands, **options) as executor:
+        return executor.run(documents)
@@ -1,17 +1,20 @@
 from __future__ import annotations
 
-from copy import deepcopy
+from copy import copy as shallow_copy
 
-from jsonpath_ng.ext import parse
+from jsonpath_ng import JSONPath
 
 from .converter import NodeConverter
+from jsonpath2path.common.fastpath import parse_path
+from jsonpath2path.common.constants import PickType
 from jsonpath2path.common.exceptions import InvalidNodesError, NodeEdgeNotMatchedError, InvalidJsonPathError
-from jsonpath2path.common.utils import get_edge, new_match, is_root, unlink
+from jsonpath2path.common.utils import get_edge, new_match, is_root, unlink_all
 
 
 class NodePicker:
     def __init__(self):
         self._matches = None
+        self._pick_type = None
 
     def create(self, edges: list[str|int], nodes: list):
         if nodes is None or len(nodes) == 0:
@@ -19,35 +22,42 @@ class NodePicker:
         if edges is None or len(edges) != len(nodes):
             raise NodeEdgeNotMatchedError("Edges and nodes must have same length.")
 
-        # Create JSONPath matches (list of `DatumInContext`)
+        # Created nodes are not in any data, so no JSONPath matching is needed.
         matches = [new_match(edge, node) for edge, node in zip(edges, nodes)]
         self._matches = matches
+        self._pick_type = PickType.CREATE
 
-    def pluck(self, data: dict|list, path: str):
-        matches = self._match_jsonpath(data, path)[::-1]
+    def pluck(self, data: dict|list, path: str | JSONPath):
+        matches = self._match_jsonpath(data, path)
 
         if len(matches) == 1 and is_root(matches[0]): # Root node can only be cleared.
-            matches[0].value = deepcopy(matches[0].value)
+            matches[0].value = shallow_copy(matches[0].value)
             data.clear()
         else:
-            for match in matches:
-                unlink(match)
+            unlink_all(matches)
 
-        self._matches = matches[::-1]
+        self._matches = matches
+        self._pick_type = PickType.PLUCK
 
-    def copy(self, data: dict|list, path:str):
+    def copy(self, data: dict|list, path: str | JSONPath):
         self._matches = self._match_jsonpath(data, path)
+        self._pick_type = PickType.COPY
 
     def to(self, converter: NodeConverter):
-        converter.source(self._matches)
+        converter.source(self._matches, self._pick_type)
 
     @staticmethod
-    def _match_jsonpath(json_data: dict | list, jsonpath: str):
+    def build_parser(jsonpath: str) -> JSONPath:
         try:
-            parser = parse(jsonpath)
+            return parse_path(jsonpath)
         except:
             raise InvalidJsonPathError(f"Invalid jsonpath: {jsonpath}")
 
+    @staticmethod
+    def _match_jsonpath(json_data: dict | list, jsonpath: str | JSONPath):
+        # Accept a pre-built parser, e.g. from a compiled command.
+        parser = jsonpath if isinstance(jsonpath, JSONPath) else NodePicker.build_parser(jsonpath)
+
         # Reversing is to prevent list out-of-bounds.
         matches = parser.find(json_data)
         if matches is None or len(matches) == 0:
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from jsonpath_ng import JSONPath
+
+from jsonpath2path.common.fastpath import SimplePath, FIELD, INDEX, FILTER
+from jsonpath2path.common.utils import PathMatch
+
+
+def _common_length(a: tuple, b: tuple) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+def may_match_same(a: tuple, b: tuple) -> bool:
+    """Whether two steps may match the same child, only distinct fields or distinct indices never do."""
+    if a == b:
+        return True
+    if a[0] == b[0] == FIELD:
+        return False
+    if a[0] == b[0] == INDEX and a[1] >= 0 and b[1] >= 0:
+        return False
+    return True
+
+
+def _invalidates(writes: tuple, prefix: tuple) -> bool:
+    """
+    Whether writing children of the containers matched by writes may change the matches of prefix:
+    when they are on the way to prefix matches, or below a filter of prefix that reads them.
+    """
+    n = min(len(writes), len(prefix))
+    if not all(may_match_same(a, b) for a, b in zip(writes[:n], prefix[:n])):
+        return False
+    return len(writes) < len(prefix) or any(kind == FILTER for kind, _ in prefix)
+
+
+class ScriptPlan:
+    """
+    Shared path prefixes of the picker and assigner paths of a script, e.g. `$.store.book[*]` of
+    `$.store.book[*].title` and `$.store.book[*].author`.
+
+    Only `SimplePath` paths are planned, a prefix is resolved once per document and reused by later paths
+    until a command writes where the prefix matches may change.
+    """
+
+    def __init__(self, paths: list[JSONPath]):
+        keys = [path.keys for path in paths if isinstance(path, SimplePath)]
+        # Path keys -> lengths of its prefixes shared with other paths, ascending.
+        self._prefixes: dict[tuple, list[int]] = {}
+        for i, a in enumerate(keys):
+            lengths = {_common_length(a, b) for j, b in enumerate(keys) if i != j}
+            lengths.discard(0)
+            if lengths:
+                self._prefixes[a] = sorted(lengths)
+
+    def __bool__(self):
+        return bool(self._prefixes)
+
+    def prefixes(self, path: SimplePath) -> list[int]:
+        return self._prefixes.get(path.keys, [])
+
+
+class PrefixCache:
+    """
+    Matches of shared prefixes for one document, following a `ScriptPlan`.
+    Commands report their writes by `changed()`, which drops prefixes whose matches may no longer hold.
+    """
+
+    def __init__(self, plan: ScriptPlan, data: dict | list):
+        self._plan = plan
+        self._data = data
+        # Prefix keys -> matches.
+        self._matches: dict[tuple, list] = {}
+
+    def bind(self, path: JSONPath) -> JSONPath:
+        """A path finding matches through this cache, path itself if nothing is shared."""
+        if isinstance(path, SimplePath) and self._plan.prefixes(path):
+            return _CachedPath(path, self)
+        return path
+
+    def find(self, path: SimplePath, data: dict | list) -> list:
+        lengths = self._plan.prefixes(path)
+        if data is not self._data or not lengths:
+            return path.find(data)
+
+        # Start from the longest prefix already resolved, or from the root.
+        start, matches = 0, [PathMatch(data)]
+        for length in reversed(lengths):
+            if path.keys[:length] in self._matches:
+                start, matches = length, self._matches[path.keys[:length]]
+                break
+
+        for length in lengths:
+            if length <= start:
+                continue
+            matches = path.walk(matches, start, length)
+            if matches is None:
+                return path.find(data)
+            self._matches[path.keys[:length]] = matches
+            start = length
+
+        matches = path.walk(matches, start, len(path.steps))
+        return path.find(data) if matches is None else list(matches)
+
+    def changed(self, writes: tuple | None) -> None:
+        """
+        :param writes: Step keys of the containers whose children a command added, replaced or removed,
+            None if unknown.
+        """
+        if writes is None:
+            self._matches.clear()
+            return
+        for prefix in [prefix for prefix in self._matches if _invalidates(writes, prefix)]:
+            del self._matches[prefix]
+
+
+class _CachedPath(JSONPath):
+    def __init__(self, path: SimplePath, cache: PrefixCache):
+        self._path = path
+        self._cache = cache
+
+    def find(self, data: dict | list) -> list:
+        return self._cache.find(self._path, data)
+
+    def __str__(self):
+        return str(self._path)
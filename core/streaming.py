@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, TextIO
+
+from .batch import BatchFailure
+from .compiler import CompiledScript, compile_script
+from jsonpath2path.common import jsonio
+from jsonpath2path.common.constants import ErrorPolicy
+from jsonpath2path.common.exceptions import InvalidJsonDataError
+
+DEFAULT_READ_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+
+_SEPARATORS = _WHITESPACE + ",]"
+
+
+@dataclass
+class StreamResult:
+    """
+    Outcome of a streaming transformation, records themselves are written out and not kept.
+    """
+    succeeded: int = 0
+    failed: int = 0
+    failures: list[BatchFailure] = field(default_factory=list)
+    elapsed: float = 0.0
+
+
+def iter_json_array(stream: TextIO, read_size: int = DEFAULT_READ_SIZE) -> Iterator[any]:
+    """
+    Incrementally decode a top-level JSON array, yielding its elements (`$[*]`) one at a time.
+    Memory is bounded by the largest element plus one read.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def read(size: int) -> bool:
+        nonlocal buf, pos, eof
+        chunk = stream.read(size)
+        if not chunk:
+            eof = True
+            return False
+        # Drop consumed text before growing the buffer.
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def next_char() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not read(read_size):
+                return ""
+
+    if next_char() != "[":
+        raise InvalidJsonDataError("Top-level JSON array expected")
+    pos += 1
+    if next_char() == "]":
+        return
+
+    while True:
+        next_char()
+        size = read_size
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                # A value not followed by a separator may continue, e.g. `1.` of the number `1.5`.
+                if eof or (end < len(buf) and buf[end] in _SEPARATORS):
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            # Double the read size so that a huge element is not decoded over and over.
+            read(size)
+            size *= 2
+        pos = end
+        yield value
+
+        char = next_char()
+        pos += 1
+        if char == "]":
+            return
+        if char != ",":
+            raise InvalidJsonDataError(f"Expected ',' or ']' in JSON array, got {char!r}")
+
+
+def iter_jsonl(stream: Iterable[str | bytes]) -> Iterator[str | bytes]:
+    """Yield the non-blank lines of a JSON Lines stream."""
+    for line in stream:
+        if line.strip():
+            yield line
+
+
+def transform_records(commands: str | Iterable[str] | CompiledScript, records: Iterable[dict | list | str],
+                      on_error: ErrorPolicy = ErrorPolicy.RAISE, result: StreamResult = None,
+                      decode: bool = False, **options) -> Iterator[dict | list]:
+    """
+    Apply a command script to each record as it arrives, yielding transformed records.
+
+    :param commands: Commands, one per line if given as a string, or a compiled script.
+    :param records: JSON structures, or JSON strings if decode.
+    :param on_error: How failed records are handled, failed records are never yielded. Raises by default,
+        unlike `run_batch()` which collects, as records yielded before a failure are already used.
+    :param result: StreamResult updated with counts and failures.
+    :param decode: Decode each record from JSON first, decoding errors count as failed records.
+    :param options: Options of `compile()`.
+    """
+    script = compile_script(commands, **options)
+    result = result if result is not None else StreamResult()
+    start = time.perf_counter()
+
+    for index, record in enumerate(records):
+        try:
+            if decode:
+                record = jsonio.loads(record)
+            record = script.apply(record)
+        except Exception as e:
+            if on_error == ErrorPolicy.RAISE:
+                raise
+            result.failed += 1
+            if on_error == ErrorPolicy.COLLECT:
+                result.failures.append(BatchFailure(index, e))
+            continue
+        result.succeeded += 1
+        yield record
+
+    result.elapsed = time.perf_counter() - start
+
+
+def stream_jsonl(commands: str | Iterable[str] | CompiledScript, source: Iterable[str], target: TextIO,
+                 on_error: ErrorPolicy = ErrorPolicy.RAISE, **options) -> StreamResult:
+    """
+    Transform a JSON Lines stream record by record, writing each result as soon as it is ready.
+
+    :param commands: Commands, one per line if given as a string, or a compiled script.
+    :param source: Text stream (or any iterable of lines) of JSON Lines.
+    :param target: Text stream receiving transformed JSON Lines.
+    :param on_error: How failed records are handled, failed records are not written. Raises by default,
+        unlike `run_batch()` which collects, as records before a failure are already written.
+    :param options: Options of `compile()`.
+    :return: StreamResult.
+    """
+    result = StreamResult()
+    for record in transform_records(commands, iter_jsonl(source), on_error, result, decode=True, **options):
+        target.write(jsonio.dumps(record))
+        target.write("\n")
+    return result
+
+
+def stream_json_array(commands: str | Iterable[str] | CompiledScript, source: TextIO, target: TextIO,
+                      on_error: ErrorPolicy = ErrorPolicy.RAISE, **options) -> StreamResult:
+    """
+    Transform a huge top-level JSON array element by element, each element (`$[*]`) is one record
+    and `$` in commands refers to it. Output is a JSON array written incrementally.
+
+    :param commands: Commands, one per line if given as a string, or a compiled script.
+    :param source: Text stream of a JSON array.
+    :param target: Text stream receiving the transformed JSON array.
+    :param on_error: How failed records are handled, failed records are not written. Raises by default,
+        unlike `run_batch()` which collects, as records before a failure are already written.
+    :param options: Options of `compile()`.
+    :return: StreamResult.
+    """
+    result = StreamResult()
+    target.write("[")
+    for i, record in enumerate(transform_records(commands, iter_json_array(source), on_error, result, **options)):
+        if i > 0:
+            target.write(",")
+        target.write(jsonio.dumps(record))
+    target.write("]")
+    return result
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
+import time
 from typing import Callable
 
 from lark import Lark, Transformer as LarkTransformer
 
 from .assigner import SlotAssigner
-from jsonpath2path.common.constants import AssignType, PickType
+from jsonpath2path.common import jsonio
+from jsonpath2path.common.constants import AssignType, PickType, CopyStrategy
+from jsonpath2path.common.copier import CopyStats
+from jsonpath2path.common.metrics import CommandMetrics
 from .converter import NodeConverter, ConverterData
 from jsonpath2path.common.exceptions import InvalidJsonDataError
 from .picker import NodePicker
@@ -43,17 +49,61 @@ bnf = r"""
     %ignore WS
 """
 
+# Path of the Lark cache file for the command parser, see `load_command_parser()`.
+PARSER_CACHE_ENV = "JSONPATH2PATH_PARSER_CACHE"
+
+_command_parser: Lark | None = None
+_command_parser_lock = threading.Lock()
+
+
+def get_command_parser() -> Lark:
+    """
+    Get the process-wide command parser, the LALR tables are built on first use only.
+    If the environment variable `JSONPATH2PATH_PARSER_CACHE` is set, the parser is loaded from that cache file.
+    """
+    global _command_parser
+    if _command_parser is None:
+        with _command_parser_lock:
+            if _command_parser is None:
+                _command_parser = Lark(bnf, parser="lalr", cache=os.environ.get(PARSER_CACHE_ENV) or False)
+    return _command_parser
+
+
+def load_command_parser(cache: bool | str = True) -> Lark:
+    """
+    (Re)build the process-wide command parser using a serialized Lark cache file.
+    The file is written on first build and loaded afterward, which keeps cold start of short-lived workers minimal.
+
+    :param cache: Cache file path, or `True` for a file in the temporary directory.
+    :return: The command parser.
+    """
+    global _command_parser
+    with _command_parser_lock:
+        _command_parser = Lark(bnf, parser="lalr", cache=cache)
+    return _command_parser
+
 
 class JsonTransformer:
     """
     A pipeline integrating picker, converter, and assigner, using chaining calls to implement JSON transformation.
+    Each instance owns its pipeline, so instances can be used in different threads concurrently;
+    a single instance must not be shared between threads.
     """
-    _data: dict | list = None
-    _to_data: dict | list = None
 
-    _picker: NodePicker = NodePicker()
-    _converter: NodeConverter = NodeConverter()
-    _assigner: SlotAssigner = SlotAssigner()
+    def __init__(self):
+        super().__init__()
+        self._data: dict | list = None
+        self._to_data: dict | list = None
+
+        self._picker: NodePicker = NodePicker()
+        self._converter: NodeConverter = NodeConverter()
+        self._assigner: SlotAssigner = SlotAssigner()
+
+        # Metrics of the current pick-to-assign round, only with a metrics hook, see `metrics()`.
+        self._copy_stats_hook = None
+        self._metrics_hook = None
+        self._round: CommandMetrics | None = None
+        self._command: str | None = None
 
     def register(self, func_name: str, convert_func: Callable[[ConverterData, any], None]) -> None:
         """
@@ -63,6 +113,39 @@ class JsonTransformer:
         """
         self._converter.register(func_name, convert_func)
 
+    def copy_strategy(self, strategy: CopyStrategy,
+                      stats_hook: Callable[[CopyStats], None] | None = None) -> JsonTransformer:
+        """
+        Set how picked nodes are copied on their way to slots.
+        :param strategy: `CopyStrategy`, `ON_WRITE` by default.
+        :param stats_hook: Callback receiving the `CopyStats` of each pick-to-assign round.
+        :return: JsonTransformer for chaining calls.
+        """
+        self._converter.copy_strategy = strategy
+        self._copy_stats_hook = stats_hook
+        self._converter.copy_stats_hook = stats_hook if self._metrics_hook is None else self._record_copy_stats
+        return self
+
+    def metrics(self, hook: Callable[[CommandMetrics], None] | None) -> JsonTransformer:
+        """
+        Set a callback receiving the `CommandMetrics` of each pick-to-assign round, e.g. a `Metrics`.
+        A round is reported by `to()`, or at the end of a command without assigner.
+        :param hook: Metrics hook, None turns metrics off, as by default.
+        :return: JsonTransformer for chaining calls.
+        """
+        self._metrics_hook = hook
+        self._converter.copy_stats_hook = self._copy_stats_hook if hook is None else self._record_copy_stats
+        return self
+
+    def columnar(self, enabled: bool = True) -> JsonTransformer:
+        """
+        Run convert functions over whole columns of the picked nodes where they support it.
+        :param enabled: Columnar execution on or off, off by default.
+        :return: JsonTransformer for chaining calls.
+        """
+        self._converter.columnar = enabled
+        return self
+
     def source(self, data: dict | list = None) -> JsonTransformer:
         """
         Set source JSON data.
@@ -83,6 +166,8 @@ class JsonTransformer:
         """
         if self._data is None:
             raise InvalidJsonDataError("Use `source()` to set the source JSON data first.")
+        started = time.perf_counter() if self._metrics_hook is not None else 0.0
+        self._round = None if self._metrics_hook is None else CommandMetrics(self._command)
         if pick_type == PickType.PLUCK:
             self._picker.pluck(self._data, jsonpath)
         elif pick_type == PickType.COPY:
@@ -94,17 +179,23 @@ class JsonTransformer:
                 nodes.append(node)
             self._picker.create(edges, nodes)
         self._picker_to_converter()
+        if self._round is not None:
+            self._round.pick_seconds = time.perf_counter() - started
+            self._round.matches = len(self._converter.nodes)
 
         return self
 
-    def convert(self, convert_func: str, *args) -> JsonTransformer:
+    def convert(self, convert_func: str, *args, **kwargs) -> JsonTransformer:
         """
         Convert picked nodes using given function.
         :param convert_func: function name.
         :param args: function parameters.
         :return: JsonTransformer for chaining calls.
         """
-        self._converter.convert(convert_func, *args)
+        started = time.perf_counter() if self._round is not None else 0.0
+        self._converter.convert(convert_func, *args, **kwargs)
+        if self._round is not None:
+            self._round.converted(str(convert_func), started)
         return self
 
     def assign(self, jsonpath: str, assign_type: AssignType = AssignType.OCCUPY) -> JsonTransformer:
@@ -113,8 +204,11 @@ class JsonTransformer:
         :param jsonpath: JSONPath for locating slots to be assigned.
         :param assign_type: `occupy` | `mount` to slots.
         """
+        started = time.perf_counter() if self._round is not None else 0.0
         self._converter_to_assigner()
         self._assigner.assign(jsonpath, assign_type)
+        if self._round is not None:
+            self._round.assign_seconds += time.perf_counter() - started
         return self
 
     def to(self, to_data: str | dict | list) -> dict | list:
@@ -124,10 +218,34 @@ class JsonTransformer:
         :return: JsonTransformer for chaining calls.
         """
         if isinstance(to_data, str):
-            self._to_data = json.loads(to_data)
+            self._to_data = jsonio.loads(to_data)
         else:
             self._to_data = to_data
-        return self._assigner.to(self._to_data)
+        if self._round is None:
+            return self._assigner.to(self._to_data)
+
+        started = time.perf_counter()
+        try:
+            return self._assigner.to(self._to_data)
+        except Exception as e:
+            self._round.error = type(e).__name__
+            raise
+        finally:
+            self._round.assign_seconds += time.perf_counter() - started
+            self._round.slots = self._assigner.written
+            self._report()
+
+    def _record_copy_stats(self, stats: CopyStats) -> None:
+        if self._round is not None:
+            self._round.objects_copied, self._round.bytes_copied = stats.objects_copied, stats.bytes_copied
+        if self._copy_stats_hook is not None:
+            self._copy_stats_hook(stats)
+
+    def _report(self) -> None:
+        """Pass the metrics of the current round to the metrics hook."""
+        if self._round is not None and self._metrics_hook is not None:
+            self._metrics_hook(self._round)
+        self._round = None
 
     def _picker_to_converter(self):
         self._picker.to(self._converter)
@@ -136,11 +254,13 @@ class JsonTransformer:
         self._converter.to(self._assigner)
 
     def __getattr__(self, item):
+        # Private attributes are never convert functions, e.g. `_converter` looked up before `__init__`.
+        if item.startswith('_'):
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
         # Call all `convert_func` using convert.
         if self._converter.has(item):
             def wrapper(*args, **kwargs):
-                self._converter.convert(item, *args, **kwargs)
-                return self
+                return self.convert(item, *args, **kwargs)
             return wrapper
         raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
 
@@ -152,7 +272,7 @@ class CommandTransformer(JsonTransformer, LarkTransformer):
 
     def __init__(self):
         super().__init__()
-        self._parser = Lark(bnf, parser="lalr")
+        self._parser = get_command_parser()
 
     def by(self, command: str):
         """
@@ -161,7 +281,16 @@ class CommandTransformer(JsonTransformer, LarkTransformer):
         :param command: JSONPathToPath command.
         """
         tree = self._parser.parse(command)
-        self.transform(tree)
+        self._command = command
+        try:
+            self.transform(tree)
+        except Exception as e:
+            if self._round is not None:
+                self._round.error = type(getattr(e, "orig_exc", e)).__name__
+                self._report()
+            raise
+        finally:
+            self._command = None
         return self
 
     def t_picker(self, items):
@@ -183,6 +312,8 @@ class CommandTransformer(JsonTransformer, LarkTransformer):
 
     def t_assigner(self, items):
         if len(items) != 2:
+            # Pluck only, the round ends here.
+            self._report()
             return
         if items[0].type == "ASSIGN_MOUNT":
             assign_type = AssignType.MOUNT
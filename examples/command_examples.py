@@ -1,6 +1,13 @@
+import time
 from copy import deepcopy
 
 from jsonpath2path.examples.example_data import game_character
+from jsonpath2path.core.compiler import compile, compile_script
+from jsonpath2path.common.cache import lambda_cache
+from jsonpath2path.common.constants import CopyStrategy
+from jsonpath2path.common.copier import measure
+from jsonpath2path.common.exceptions import NodeToSlotError
+from jsonpath2path.common.metrics import Metrics
 from jsonpath2path.core.transformer import CommandTransformer
 
 if __name__ == '__main__':
@@ -19,6 +26,13 @@ if __name__ == '__main__':
     for skill in data['character']['skills']:
         assert (skill['cooldown'] <= 4)
 
+    # Move the items above level 4 out of a list, adjacent or not, in their order.
+    data = {'items': [{'level': level} for level in (5, 1, 9, 8, 4, 7, 2)], 'picked': []}
+    transformer.source(data).by('$.items[?(@.level > 4)] => $.picked').to(data)
+    assert data == {'items': [{'level': 1}, {'level': 4}, {'level': 2}],
+                    'picked': [{'level': 5}, {'level': 9}, {'level': 8}, {'level': 7}]}
+    assert compile('$.items[?(@.level < 5)] ->').apply(data) == {'items': [], 'picked': data['picked']}
+
     # Delete the character's current weapon and armor information.
     data = deepcopy(game_character)
     transformer.source(data).by('$.character.equipment.* ->')
@@ -50,6 +64,11 @@ if __name__ == '__main__':
     for skill in data['character']['skills']:
         assert (skill['cooldown'] >= 10)
 
+    # Rename the keys of skills at every level to PascalCase.
+    data = deepcopy(game_character)
+    transformer.source(data).by('$.character.skills | k_rename_deep "pascal" "snake" => $.character').to(data)
+    assert data['character']['Skills'][0]['Name'] == 'Sword Slash'
+
     # ========== Another Target JSON Data ==========
     # Move skills to a new JSON
     data = deepcopy(game_character)
@@ -64,3 +83,181 @@ if __name__ == '__main__':
     transformer.source(data).by('@$.character.attributes => $').to(to_data)
     assert "attributes" in data['character']
     assert len(to_data["attributes"]) == 4
+
+    # Replace the contents of a list, the target itself is kept
+    to_data = ["stale"]
+    result = compile('@$.character.skills -> $').apply(deepcopy(game_character), to_data)
+    assert result is to_data and [skill['name'] for skill in to_data] == ['Sword Slash', 'Shield Bash']
+    # Mount skills into a list, by their indices
+    to_data = []
+    compile('@$.character.skills[*] => $').apply(deepcopy(game_character), to_data)
+    assert to_data == game_character['character']['skills']
+    # A list cannot replace a dict
+    try:
+        compile('@$.character.skills -> $').apply(deepcopy(game_character), {})
+        assert False
+    except NodeToSlotError:
+        pass
+
+    # ========== Copy Strategies ==========
+    # Renaming plucked skills copies nothing, all they hold would have been deep copied.
+    for strategy in CopyStrategy:
+        for pick, name in (('$', 'pluck'), ('@$', 'copy')):
+            stats, data = [], deepcopy(game_character)
+            skills = data['character']['skills']
+            skills_objects, skills_bytes = measure(skills)
+            compile(f'{pick}.character.skills | k_rename "upper" => $.character', copy_strategy=strategy,
+                    copy_stats_hook=stats.append).apply(data)
+            # Only deep copies, or copy-picked nodes under ON_WRITE, do not land by reference.
+            shared = strategy != CopyStrategy.DEEP and (name == 'pluck' or strategy == CopyStrategy.REFERENCE)
+            assert (data['character']['SKILLS'] is skills) == shared
+            assert data['character']['SKILLS'] == game_character['character']['skills']
+            if shared:
+                assert (stats[0].objects_avoided, stats[0].bytes_avoided) == (skills_objects, skills_bytes)
+                assert (stats[0].objects_copied, stats[0].bytes_copied) == (0, 0)
+            else:
+                assert (stats[0].objects_copied, stats[0].bytes_copied) == (skills_objects, skills_bytes)
+                assert (stats[0].objects_avoided, stats[0].bytes_avoided) == (0, 0)
+    # Converting a field copies only the containers on the way to it, the source keeps its values.
+    for strategy in (CopyStrategy.ON_WRITE, CopyStrategy.REFERENCE):
+        stats, data = [], deepcopy(game_character)
+        compile('@$.character | v_number_convert_units "$.skills[*].damage" 1.5 -> $.copy', copy_strategy=strategy,
+                copy_stats_hook=stats.append).apply(data)
+        assert data['character'] == game_character['character'] and data['copy']['skills'][0]['damage'] == 75
+        if strategy == CopyStrategy.REFERENCE:
+            # The character, its skills and each skill, the equipment and attributes are shared.
+            assert (stats[0].objects_copied, stats[0].objects_avoided) == (4, 2)
+            assert data['copy']['equipment'] is data['character']['equipment']
+        else:
+            assert stats[0].objects_copied == 6 and data['copy']['equipment'] is not data['character']['equipment']
+
+    # ========== Columnar Conversion ==========
+    # Scale the damage of all skills, converted as one column, with the same result as node by node.
+    data, columnar_data = deepcopy(game_character), deepcopy(game_character)
+    command = '$.character.skills[*] | v_number_convert_units "$.damage" 1.5 => $.character.skills'
+    transformer.source(data).by(command).to(data)
+    CommandTransformer().columnar().source(columnar_data).by(command).to(columnar_data)
+    assert columnar_data == data
+    assert data['character']['skills'][0]['damage'] == 75
+
+    # Chained per-field converters of a compiled command run in one pass over the skills.
+    data = deepcopy(game_character)
+    compile('$.character.skills[*] | v_number_convert_units "$.damage" 1.15 | v_number_round "$.damage" '
+            '| t_number_to_string "$.cooldown" | v_string_truncate "$.name" 5 => $.character.skills').apply(data)
+    assert data['character']['skills'][1] == {"name": "Shiel", "damage": 34, "cooldown": "5"}
+
+    # Drop repeated skills, compared by name, keeping the first of each in order.
+    data = deepcopy(game_character)
+    data['character']['skills'] += deepcopy(data['character']['skills'])
+    transformer.source(data).by('$.character | v_list_unique "$.skills" "$.name" => $').to(data)
+    assert [skill['name'] for skill in data['character']['skills']] == ['Sword Slash', 'Shield Bash']
+
+    # Keep only the skill with the highest damage, selected without sorting all skills.
+    data = deepcopy(game_character)
+    transformer.source(data).by('$.character | v_list_sort "$.skills" true "$.damage" 1 => $').to(data)
+    assert [skill['name'] for skill in data['character']['skills']] == ['Sword Slash']
+
+    # ========== Metrics ==========
+    # Count runs, picked nodes and time per stage and converter of each command.
+    metrics, seen = Metrics(), []
+    command = '$.character.skills[*] | v_number_round "$.damage" | t_number_to_string "$.cooldown" => $.character.skills'
+    compiled = compile(command, metrics_hook=lambda m: (seen.append(m), metrics(m)))
+    compiled.apply(deepcopy(game_character))
+    compiled.apply(deepcopy(game_character))
+    assert seen[0].matches == 2 and seen[0].slots == 2
+    assert [name for name, _ in seen[0].converters] == ['v_number_round+t_number_to_string']
+    runs = [line for line in metrics.prometheus().splitlines() if line.startswith('jsonpath2path_command_runs_total')]
+    assert runs == ['jsonpath2path_command_runs_total{command="%s"} 2' % command.replace('"', '\\"')]
+    copied = [line for line in metrics.prometheus().splitlines() if line.startswith('jsonpath2path_copied_objects')]
+    assert copied == ['jsonpath2path_copied_objects_total{command="%s"} %d'
+                      % (command.replace('"', '\\"'), 2 * seen[0].objects_copied)]
+    # A command failing to assign placed no nodes, whatever its previous run placed.
+    seen.clear()
+    reused = CommandTransformer().metrics(seen.append)
+    data = deepcopy(game_character)
+    reused.source(data).by(command).to(data)
+    try:
+        reused.source(data).by(command).to({'character': {}})
+        assert False
+    except Exception:
+        pass
+    assert seen[0].slots == 2 and seen[1].error is not None and seen[1].slots == 0
+    # Without a hook nothing is measured, not even the time.
+    perf_counter, clock_reads = time.perf_counter, []
+    time.perf_counter = lambda: clock_reads.append(1) or perf_counter()
+    try:
+        compile(command).apply(deepcopy(game_character))
+        compile_script([command, '$.character.name ->']).apply(deepcopy(game_character))
+        data = deepcopy(game_character)
+        CommandTransformer().source(data).by(command).to(data)
+    finally:
+        time.perf_counter = perf_counter
+    assert clock_reads == []
+
+    # ========== Lambda Cache ==========
+    # A lambda is evaluated once per process, when first compiled, not each time a command runs.
+    command = '@$.character.skills[*].damage | v_map "lambda v: v * 3 + 1" -> $.character.skills[*].tripled'
+    before = lambda_cache.stats()
+    compiled = compile(command)
+    for _ in range(2):
+        data = compiled.apply(deepcopy(game_character))
+        assert [skill['tripled'] for skill in data['character']['skills']] == [151, 91]
+    assert lambda_cache.stats().misses == before.misses + 1 and lambda_cache.stats().hits == before.hits
+    compile(command).apply(deepcopy(game_character))
+    assert lambda_cache.stats().hits == before.hits + 1
+    # A JSONPath maps each node to its first match, None without one.
+    data = compile('@$.character.skills[*] | v_map "$.name" -> $.character.skills[*].title').apply(
+        deepcopy(game_character))
+    assert [skill['title'] for skill in data['character']['skills']] == ['Sword Slash', 'Shield Bash']
+    # Invalid lambdas are reported when the command runs.
+    try:
+        compile('@$.character.level | v_map "lambda v: v +" -> $.character.level').apply(deepcopy(game_character))
+        assert False
+    except ValueError:
+        pass
+
+    # ========== Shared Path Prefixes ==========
+    # A script reuses matches of path prefixes between commands, commands writing there drop them,
+    # so the script gives what its commands give one after another.
+    scripts = [
+        # Pluck a list element, then read the list.
+        ['`[["picked", []]]` => $.character', '$.character.skills[0] => $.character.picked',
+         '@$.character.skills[*].damage | v_map "lambda v: v + 1" -> $.character.skills[*].damage'],
+        # Pluck by a filter, then read by filters the list it left and the list it mounted into.
+        ['`[["picked", []]]` => $.character', '$.character.skills[?(@.cooldown > 4)] => $.character.picked',
+         '@$.character.skills[*] -> $.character.kept',
+         '@$.character.picked[?(@.damage > 10)].name -> $.character.title'],
+        # Mount into a prefix, then read below it and filter on what it wrote.
+        ['`[["extra", {"name": "Kick", "damage": 9, "cooldown": 1}]]` => $.character.equipment',
+         '@$.character.equipment.extra.damage -> $.character.skills[1].damage',
+         '@$.character.skills[?(@.damage < 10)].cooldown | v_map "lambda v: v * 10" '
+         '-> $.character.skills[?(@.damage < 10)].cooldown'],
+        # Replace a container, read below it, then pluck from it.
+        ['`[["x", {"y": 1}]]` => $.character.attributes', '@$.character.attributes.x.y -> $.character.level',
+         '$.character.attributes.x ->'],
+        # Move a list, then read and pluck its elements by index.
+        ['$.character.skills -> $.character.equipment.skills',
+         '@$.character.equipment.skills[1].name -> $.character.title', '$.character.equipment.skills[0] ->',
+         '@$.character.equipment.skills[0] -> $.character.best'],
+    ]
+    for commands in scripts:
+        data = deepcopy(game_character)
+        for command in commands:
+            data = compile(command).apply(data)
+        assert compile_script(commands).apply(deepcopy(game_character)) == data
+    assert data['character']['title'] == data['character']['best']['name'] == 'Shield Bash'
+
+    # ========== Incremental Re-application ==========
+    # After the name changes, only the command reading it runs again on the previous output.
+    seen = []
+    script = compile_script(['@$.character.name -> $.character.title',
+                             '@$.character.skills[*].damage | v_map "lambda v: v * 2" -> $.character.skills[*].critical'],
+                            metrics_hook=seen.append)
+    previous = deepcopy(game_character)
+    output = script.apply(deepcopy(previous))
+    data = deepcopy(previous)
+    data['character']['name'] = 'Elara the Brave'
+    seen.clear()
+    output = script.apply_incremental(data, ['$.character.name'], previous, output)
+    assert [metrics.command for metrics in seen] == ['@$.character.name -> $.character.title']
+    assert output == script.apply(deepcopy(data))
\ No newline at end of file
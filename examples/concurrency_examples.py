@@ -0,0 +1,116 @@
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
+from jsonpath2path import compile
+from jsonpath2path.common.constants import ErrorPolicy
+from jsonpath2path.core.batch import run_batch
+from jsonpath2path.core.parallel import ParallelExecutor, run_parallel
+from jsonpath2path.examples.example_data import game_character
+from jsonpath2path.core.transformer import CommandTransformer
+
+THREADS = 8
+ROUNDS = 100
+
+COMMANDS = [
+    '`[["agility", 50], ["lucky", 20]]` => $.character.attributes',
+    '$.character.skills[?(@.cooldown > 4)] ->',
+    '@$.character.skills[*].cooldown | v_map "lambda v: v+5" -> $.character.skills[*].cooldown',
+    '@$.character.attributes | k_rename "upper" => $.character',
+    '$.character.equipment => $',
+]
+
+
+def run(transformer: CommandTransformer, data: dict, command: str):
+    transformer.source(data).by(command)
+    if not command.endswith('->'):  # Pluck only commands have nothing to assign.
+        transformer.to(data)
+
+
+def expected_result(level: int) -> dict:
+    data = deepcopy(game_character)
+    data['character']['level'] = level
+    for command in COMMANDS:
+        run(CommandTransformer(), data, command)
+    return data
+
+
+def transform_with_instance(level: int) -> dict:
+    # One transformer per thread, documents of other threads must not leak in.
+    transformer = CommandTransformer()
+    data = deepcopy(game_character)
+    data['character']['level'] = level
+    expected = expected_result(level)
+    for _ in range(ROUNDS):
+        result = deepcopy(data)
+        for command in COMMANDS:
+            run(transformer, result, command)
+        assert result == expected
+    return result
+
+
+def transform_with_compiled(level: int) -> dict:
+    # Compiled commands are shared by all threads.
+    data = deepcopy(game_character)
+    data['character']['level'] = level
+    expected = expected_result(level)
+    for _ in range(ROUNDS):
+        result = deepcopy(data)
+        for command in COMPILED:
+            command.apply(result)
+        assert result == expected
+    return result
+
+
+COMPILED = [compile(command) for command in COMMANDS]
+
+if __name__ == '__main__':
+    # ========== Concurrent transformations ==========
+    # Different documents transformed by different threads at the same time give sequential results.
+    with ThreadPoolExecutor(THREADS) as pool:
+        for level, result in zip(range(THREADS), pool.map(transform_with_instance, range(THREADS))):
+            assert result == expected_result(level)
+            assert result['character']['level'] == level
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        for level, result in zip(range(THREADS), pool.map(transform_with_compiled, range(THREADS))):
+            assert result == expected_result(level)
+
+    # ========== Worker processes ==========
+    # Worker processes give what a batch in this process gives: outputs in input order, failures by input index.
+    def documents():
+        for level in range(50):
+            data = deepcopy(game_character)
+            data['character']['level'] = level
+            if level % 7 == 3:
+                del data['character']['equipment']
+            yield data
+
+    command = '\n'.join(COMMANDS)
+    expected = run_batch(command, documents())
+    assert expected.failed == 7
+    result = run_parallel(command, documents(), workers=2, chunk_size=4)
+    assert result.outputs == expected.outputs
+    assert [f.index for f in result.failures] == [f.index for f in expected.failures] == list(range(3, 50, 7))
+    assert (result.failed, len(result.timings)) == (7, 50)
+    assert run_parallel(command, documents(), workers=2, chunk_size=4, on_error=ErrorPolicy.SKIP).failures == []
+
+    # Out of order, chunks come as they complete.
+    result = run_parallel(command, documents(), workers=2, chunk_size=4, ordered=False)
+    levels = sorted(output['character']['level'] for output in result.outputs)
+    assert levels == [output['character']['level'] for output in expected.outputs]
+
+    # Documents are read no further ahead than max_in_flight chunks.
+    pulled = []
+
+    def counted(items):
+        for item in items:
+            pulled.append(item)
+            yield item
+
+    with ParallelExecutor(command, workers=2, chunk_size=4, max_in_flight=3) as executor:
+        outputs = []
+        for yielded, chunk in enumerate(executor.imap(counted(documents()))):
+            # Chunks yielded before, and up to 3 submitted or waiting for their turn.
+            assert len(pulled) <= (yielded + 3) * 4
+            outputs.extend(chunk.outputs)
+        assert outputs == expected.outputs and len(pulled) == 50
@@ -0,0 +1,146 @@
+import datetime
+import io
+import json
+import math
+import os
+import tempfile
+
+from jsonpath2path.cli import main
+from jsonpath2path.common import jsonio
+from jsonpath2path.common.constants import ErrorPolicy, FileFormat
+from jsonpath2path.core.batch import run_batch
+from jsonpath2path.core.files import transform_file, transform_stream
+from jsonpath2path.core.streaming import iter_json_array
+
+
+def installed_backends() -> list[str]:
+    backends = []
+    for name in jsonio.JSON_BACKENDS:
+        try:
+            jsonio.set_json_backend(name)
+        except ImportError:
+            continue
+        backends.append(name)
+    return backends
+
+
+def read_lines(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def write_lines(path: str, documents: list) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(document) + "\n" for document in documents)
+
+if __name__ == '__main__':
+    # ========== Incremental Array Decoding ==========
+    # Elements split across reads anywhere, even inside a number, decode the same as a whole.
+    arrays = [
+        [i * 1.5 for i in range(200)],
+        [1e-7 * i for i in range(200)],
+        [-i for i in range(100)] + [True, False, None, "a,]b", {"k": [1, 2.5e3]}, [], ""],
+    ]
+    for array in arrays:
+        text = json.dumps(array)
+        for read_size in (1, 2, 3):
+            assert list(iter_json_array(io.StringIO(text), read_size)) == array
+    assert list(iter_json_array(io.StringIO(json.dumps([i * 1.5 for i in range(200000)])))) == \
+        [i * 1.5 for i in range(200000)]
+
+    # ========== JSON Backends ==========
+    # Every installed backend reads and writes the same data as the json module.
+    previous_backend = jsonio.get_json_backend()
+    documents = [
+        {"s": "é/\\\"\u2028", "i": 2 ** 70, "n": -2 ** 63, "f": [0.1, 1e-07, 1.5e300, -0.0], "b": [True, False, None]},
+        {"nan": float("nan"), "inf": [float("inf"), -float("inf")], "null": None},
+        [[], {}, "", 0, {"nested": [{"k": [1, {"v": "x"}]}]}],
+    ]
+    expected = [jsonio._json_dumps(document) for document in documents]
+    try:
+        for backend in installed_backends():
+            jsonio.set_json_backend(backend)
+            for document, text in zip(documents, expected):
+                written = jsonio.dumps_bytes(document)
+                assert jsonio.dumps(document) == written.decode("utf-8")
+                # NaN and infinities are written as by the json module, not as null.
+                assert written.count(b"NaN") == text.count("NaN") and written.count(b"Infinity") == text.count("Infinity")
+                assert repr(jsonio.loads(written)) == repr(json.loads(text))
+                assert repr(jsonio.loads(text)) == repr(json.loads(text))
+            # Types the json module rejects fail on every backend.
+            for value in (datetime.date(2020, 1, 1), datetime.datetime(2020, 1, 1), {1, 2}, object()):
+                try:
+                    jsonio.dumps_bytes({"v": value})
+                    assert False
+                except TypeError:
+                    pass
+            assert math.isnan(jsonio.loads(b"NaN"))
+            # Integers just beyond 64 bits, or 19 digits below -2**63, stay exact.
+            for number in (-2 ** 63 - 1, -9300000000000000001, 2 ** 64, 2 ** 64 - 1, -2 ** 63, 10 ** 30):
+                for text in (str(number), f'{{"id": {number}}}'):
+                    assert repr(jsonio.loads(text)) == repr(jsonio.loads(text.encode())) == repr(json.loads(text))
+                assert jsonio.loads(jsonio.dumps_bytes([number])) == [number]
+    finally:
+        jsonio.set_json_backend(previous_backend)
+
+    # ========== Files and Streams ==========
+    with tempfile.TemporaryDirectory() as directory:
+        source, target = os.path.join(directory, "in.jsonl"), os.path.join(directory, "out.jsonl")
+        records = [{"a": {"b": i}} for i in range(5)] + [{"x": 1}]
+        write_lines(source, records)
+        command = '$.a.b -> $.c'
+        expected = [{"a": {}, "c": i} for i in range(5)]
+
+        # One document per line, the failed one is not written.
+        result = transform_file(command, source, target, on_error=ErrorPolicy.COLLECT)
+        assert read_lines(target) == expected
+        assert (result.succeeded, result.failed, [f.index for f in result.failures]) == (5, 1, [5])
+
+        # Byte streams, and text streams.
+        for source_stream, target_stream in ((io.BytesIO(), io.BytesIO()), (io.StringIO(), io.StringIO())):
+            text = json.dumps(records[:5])
+            source_stream.write(text.encode("utf-8") if isinstance(source_stream, io.BytesIO) else text)
+            source_stream.seek(0)
+            transform_stream(command, source_stream, target_stream, FileFormat.JSON_ARRAY)
+            assert json.loads(target_stream.getvalue()) == expected
+
+        # The command line, with metrics.
+        metrics_file = os.path.join(directory, "metrics.prom")
+        assert main([source, "-c", command, "-o", target, "--on-error", "skip", "--metrics-file", metrics_file]) == 1
+        assert read_lines(target) == expected
+        assert os.path.getsize(metrics_file) > 0
+        assert main([target, "-c", "$.c -> $.a.b", "-o", source]) == 0
+        assert read_lines(source) == records[:5]
+
+        # A whole document is read before it is written, so the target may be the source.
+        document = os.path.join(directory, "document.json")
+        with open(document, "w", encoding="utf-8") as f:
+            json.dump({"a": {"b": 1}}, f)
+        transform_file(command, document, document)
+        with open(document, encoding="utf-8") as f:
+            assert json.load(f) == {"a": {}, "c": 1}
+        # Other formats would truncate the source before reading it.
+        try:
+            transform_file(command, source, source)
+            assert False
+        except ValueError:
+            pass
+        assert read_lines(source) == records[:5]
+
+    # ========== Batches ==========
+    # Failed documents are collected by default, outputs hold the others in input order.
+    documents = [{"a": {"b": 1}}, {"x": 1}, '{"a": {"b": 2}}', "not json", {"a": {"b": 3}}]
+    result = run_batch('$.a.b -> $.c', documents)
+    assert result.outputs == [{"a": {}, "c": 1}, {"a": {}, "c": 2}, {"a": {}, "c": 3}]
+    assert [failure.index for failure in result.failures] == [1, 3]
+    assert result.failures[0].command == '$.a.b -> $.c' and result.failures[1].command is None
+    assert (result.succeeded, result.failed, result.total, len(result.timings)) == (3, 2, 5, 5)
+    # Skipped documents are only counted.
+    result = run_batch('$.a.b -> $.c', [{"a": {"b": 1}}, {"x": 1}], ErrorPolicy.SKIP)
+    assert result.outputs == [{"a": {}, "c": 1}] and result.failed == 1 and result.failures == []
+    # Or the first failure is raised.
+    try:
+        run_batch('$.a.b -> $.c', [{"a": {"b": 1}}, {"x": 1}], ErrorPolicy.RAISE)
+        assert False
+    except Exception as e:
+        assert "No matches" in str(e)
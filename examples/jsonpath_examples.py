@@ -0,0 +1,56 @@
+from jsonpath_ng import DatumInContext
+from jsonpath_ng.ext import parse
+
+from jsonpath2path.common.fastpath import SimplePath, parse_path
+from jsonpath2path.common.utils import get_edge
+from jsonpath2path.examples.example_data import game_character
+
+DOCUMENTS = [
+    game_character,
+    {"a": [{"c": 5, "n": "Sword Slash"}, {"c": "5", "n": "Shield"}, {"c": 2.7}, {"c": True}, {"c": "x"}, {}, 3]},
+    {"a": {"x": {"c": 5}, "y": {"c": 1}}, "b": "text", "c": [[1, 2], [], [3]]},
+    [{"b": {"c": 2.5}, "n": "Spear"}, {"b": {"c": 1}}, {"b": None}, 3, "3", None],
+    {"a": [], "b": {}, "c": 0, "d": "", "e": None},
+]
+
+# Paths compiled into `SimplePath`, each matched against every document.
+PATHS = [
+    "$", "$.character", "$.character.skills[0].name", "$.character.skills[-1]", "$.character.skills[*].cooldown",
+    "$.character.attributes.*", "$.*", "$.*.*", "$[0]", "$[*]", "$[*][*]", "$.a[*].c", "$.a.*.c", "$.b[0]",
+    "$.c[*]", "$.d[*]", "$.a[9]",
+    "$.character.skills[?(@.cooldown > 4)]", "$.character.skills[?(@.cooldown > 4)].name",
+    "$.character.skills[?(@.name == 'Shield Bash' & @.damage >= 30)]", "$.character.skills[?(@.name =~ '^Sw')]",
+    "$.a[?(@.c == 5)]", "$.a[?(@.c)]", "$.a[?(@ == 3)]", "$.a[?(@.c == true)]", "$.a[?(@.n != Shield)]",
+    "$[?(@.b.c >= 2.5)]", "$[?(@.b)]", "$.a[?c < 4]", "$.*[?(@.c > 1)]", "$[?($.n =~ 'S')]", "$.a[?(@.c > 1)]",
+]
+
+
+def same(a, b) -> bool:
+    if isinstance(a, DatumInContext):
+        # SimplePath fell back to jsonpath_ng, parents may be containers jsonpath_ng builds on the fly.
+        return a.value == b.value and str(a.full_path) == str(b.full_path)
+    if (a.context is None) != (b.context is None) or a.value != b.value or get_edge(a) != get_edge(b):
+        return False
+    return a.context is None or a.context.value is b.context.value
+
+
+def outcome(parser, data):
+    try:
+        return parser.find(data), None
+    except Exception as e:
+        return None, type(e)
+
+
+if __name__ == '__main__':
+    # ========== Simple paths match as jsonpath_ng.ext does ==========
+    for jsonpath in PATHS:
+        assert isinstance(parse_path(jsonpath), SimplePath), jsonpath
+        for data in DOCUMENTS:
+            (expected, expected_error), (matches, error) = outcome(parse(jsonpath), data), outcome(parse_path(jsonpath), data)
+            assert error == expected_error, (jsonpath, data)
+            if error is None:
+                assert len(matches) == len(expected) and all(map(same, matches, expected)), (jsonpath, data)
+
+    # ========== Other paths are left to jsonpath_ng ==========
+    for jsonpath in ["$..name", "$.character.skills[0:1]", "$['a','b']", "$.a[?(@.c + 1 > 2)]", "$.a[?(@.* > 1)]"]:
+        assert not isinstance(parse_path(jsonpath), SimplePath), jsonpath
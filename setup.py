@@ -55,6 +55,10 @@ setup(
     python_requires=">=3.9",
     install_requires=["jsonpath_ng>=1.7.0", "lark>=1.2.2"],
     license="Apache-2.0",
+    extras_require={"fast": ["orjson>=3.8"], "columnar": ["numpy>=1.20"]},
+    entry_points={
+        "console_scripts": ["jsonpath2path=jsonpath2path.cli:main"]
+    },
     cmdclass={
         'clean': CleanCommand
     }